@@ -16,10 +16,23 @@ Modules:
 __version__ = '1.0.0'
 __author__ = 'SAT Tools Team'
 
-from .extractor import SBSParser, ParameterExtractor, ParameterSchema
-from .thumbnail import ThumbnailRenderer, ThumbnailMetadata, BatchProcessor
-from .core import TextureBaker, BakeResult, CallbackManager
-from .uploader import AssetUploader, UploadResult
+import importlib
+
+# Public names and the subpackage providing each; imported on first access
+# (PEP 562) so loading one tool does not import all the others
+_EXPORTS = {
+    'SBSParser': '.extractor',
+    'ParameterExtractor': '.extractor',
+    'ParameterSchema': '.extractor',
+    'ThumbnailRenderer': '.thumbnail',
+    'ThumbnailMetadata': '.thumbnail',
+    'BatchProcessor': '.thumbnail',
+    'TextureBaker': '.core',
+    'BakeResult': '.core',
+    'CallbackManager': '.core',
+    'AssetUploader': '.uploader',
+    'UploadResult': '.uploader',
+}
 
 __all__ = [
     # Extractor
@@ -38,3 +51,12 @@ __all__ = [
     'AssetUploader',
     'UploadResult',
 ]
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
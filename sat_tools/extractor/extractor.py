@@ -12,10 +12,13 @@ from typing import List, Dict, Any, Optional
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
+import ast
 import json
 import re
 import tempfile
 
+from .schema import ParamKind
+
 # Setup logging
 logger = logging.getLogger(__name__)
 
@@ -250,20 +253,21 @@ class ParameterExtractor:
                         if type_match:
                             param_type = type_match.group(1)
                         
+                        param_type = self._normalize_type(param_type)
+                        
                         # Parse additional info like default value
                         default_value = None
                         value_match = re.search(r'DEFAULT\[([^\]]+)\]', line)
                         if value_match:
-                            try:
-                                default_value = eval(value_match.group(1))
-                            except:
-                                default_value = value_match.group(1)
+                            default_value = self._coerce_default(
+                                ParamKind.from_type(param_type), value_match.group(1)
+                            )
                         
                         current_graph['inputs'].append({
                             'id': identifier,
                             'name': identifier,
                             'label': identifier.replace('_', ' ').title(),
-                            'type': self._normalize_type(param_type),
+                            'type': param_type,
                             'value': default_value,
                             'defaultValue': default_value,
                         })
@@ -294,6 +298,25 @@ class ParameterExtractor:
         
         return result
     
+    def _coerce_default(self, kind: ParamKind, raw: str) -> Any:
+        """Convert a raw DEFAULT[...] string to a value matching the parameter kind."""
+        try:
+            match kind:
+                case ParamKind.FLOAT:
+                    return float(raw)
+                case ParamKind.INT | ParamKind.ENUM:
+                    return int(raw)
+                case ParamKind.FLOAT2 | ParamKind.FLOAT3 | ParamKind.FLOAT4:
+                    return [float(v) for v in raw.split(',')]
+                case ParamKind.INT2 | ParamKind.INT3 | ParamKind.INT4:
+                    return [int(v) for v in raw.split(',')]
+                case ParamKind.STRING | ParamKind.IMAGE:
+                    return raw
+                case _:
+                    return ast.literal_eval(raw)
+        except (ValueError, SyntaxError):
+            return raw
+    
     def _normalize_type(self, raw_type: str) -> str:
         """Normalize parameter type string."""
         raw_type = raw_type.lower().strip()
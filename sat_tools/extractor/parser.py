@@ -50,6 +50,8 @@ class SBSParser:
         self._pysbs = None
         self._context = None
         self._loaded_doc = None
+        # Shared copies of repeated node strings (definitions, GUI names)
+        self._str_intern: Dict[str, str] = {}
         
     def _detect_sat_path(self) -> Optional[str]:
         """Detect SAT installation path."""
@@ -186,12 +188,28 @@ class SBSParser:
                 raise ValueError(f"Graph not found: {graph_identifier}")
                 
             if hasattr(graph, 'getAllNodes'):
+                intern = self._str_intern.setdefault
+                append = nodes.append
+                make_node = NodeInfo
+                # Unbound accessors resolved once per node class
+                accessors: Dict[type, tuple] = {}
                 for node in graph.getAllNodes():
-                    nodes.append(NodeInfo(
-                        identifier=node.mUID or '',
-                        definition=node.getDefinition() if hasattr(node, 'getDefinition') else '',
-                        gui_name=node.getGuiName() if hasattr(node, 'getGuiName') else '',
-                        position=node.getPosition() if hasattr(node, 'getPosition') else (0, 0)
+                    node_type = type(node)
+                    funcs = accessors.get(node_type)
+                    if funcs is None:
+                        funcs = accessors[node_type] = (
+                            getattr(node_type, 'getDefinition', None),
+                            getattr(node_type, 'getGuiName', None),
+                            getattr(node_type, 'getPosition', None),
+                        )
+                    get_def, get_name, get_pos = funcs
+                    definition = get_def(node) if get_def else ''
+                    gui_name = get_name(node) if get_name else ''
+                    append(make_node(
+                        node.mUID or '',
+                        intern(definition, definition),
+                        intern(gui_name, gui_name),
+                        get_pos(node) if get_pos else (0, 0)
                     ))
         except Exception as e:
             raise RuntimeError(f"Failed to get nodes: {e}")
@@ -232,3 +250,4 @@ class SBSParser:
     def close(self):
         """Close the loaded document and free resources."""
         self._loaded_doc = None
+        self._str_intern.clear()
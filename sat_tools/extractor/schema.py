@@ -5,7 +5,14 @@ Defines the schema for extracted parameter JSON files,
 providing validation and documentation.
 """
 
-from typing import Dict, Any
+import json
+from enum import IntEnum
+from typing import Dict, Any, List, Literal, Optional
+
+try:
+    import msgspec
+except ImportError:  # msgspec is optional; fall back to stdlib json
+    msgspec = None
 
 # JSON Schema for parameter files
 PARAMETER_FILE_SCHEMA: Dict[str, Any] = {
@@ -113,6 +120,112 @@ PARAMETER_FILE_SCHEMA: Dict[str, Any] = {
 }
 
 
+class ParamKind(IntEnum):
+    """Integer codes for ParameterValue.type, used for internal dispatch."""
+    FLOAT = 0
+    FLOAT2 = 1
+    FLOAT3 = 2
+    FLOAT4 = 3
+    INT = 4
+    INT2 = 5
+    INT3 = 6
+    INT4 = 7
+    BOOL = 8
+    STRING = 9
+    ENUM = 10
+    IMAGE = 11
+    UNKNOWN = 12
+    
+    @classmethod
+    def from_type(cls, type_name: str) -> 'ParamKind':
+        """Map a schema type string to its kind (UNKNOWN if unrecognized)."""
+        return _STR_TO_KIND.get(type_name, cls.UNKNOWN)
+    
+    @property
+    def type_name(self) -> str:
+        """Schema type string for this kind."""
+        return _KIND_TO_STR[self]
+
+
+_STR_TO_KIND: Dict[str, ParamKind] = {
+    'float': ParamKind.FLOAT,
+    'float2': ParamKind.FLOAT2,
+    'float3': ParamKind.FLOAT3,
+    'float4': ParamKind.FLOAT4,
+    'int': ParamKind.INT,
+    'int2': ParamKind.INT2,
+    'int3': ParamKind.INT3,
+    'int4': ParamKind.INT4,
+    'bool': ParamKind.BOOL,
+    'string': ParamKind.STRING,
+    'enum': ParamKind.ENUM,
+    'image': ParamKind.IMAGE,
+    'unknown': ParamKind.UNKNOWN,
+}
+_KIND_TO_STR: Dict[ParamKind, str] = {kind: name for name, kind in _STR_TO_KIND.items()}
+
+# Enumerations from PARAMETER_FILE_SCHEMA, as types the decoder enforces
+ParamTypeName = Literal[
+    'float', 'float2', 'float3', 'float4',
+    'int', 'int2', 'int3', 'int4',
+    'bool', 'string', 'enum', 'image', 'unknown'
+]
+FileTypeName = Literal['sbs', 'sbsar']
+
+
+if msgspec is not None:
+    class ParameterValue(msgspec.Struct, rename='camel', omit_defaults=True):
+        """Typed parameter value (mirrors definitions/ParameterValue)."""
+        type: ParamTypeName
+        value: Any
+        default_value: Any = None
+        min: Optional[float] = None
+        max: Optional[float] = None
+        step: Optional[float] = None
+        options: Optional[List[str]] = None
+
+    class Parameter(msgspec.Struct, rename='camel', omit_defaults=True):
+        """Typed parameter (mirrors definitions/Parameter)."""
+        id: str
+        name: str
+        label: str
+        parameter: ParameterValue
+        description: Optional[str] = None
+
+    class Node(msgspec.Struct, rename='camel', omit_defaults=True):
+        """Typed node (mirrors definitions/Node)."""
+        id: str
+        name: str
+        type: str
+        parameters: List[Parameter]
+        category: Optional[str] = None
+
+    class Graph(msgspec.Struct, rename='camel', omit_defaults=True):
+        """Typed graph (mirrors definitions/Graph)."""
+        id: str
+        name: str
+        nodes: List[Node]
+        description: Optional[str] = None
+        category: Optional[str] = None
+
+    class FileMetadata(msgspec.Struct, rename='camel', omit_defaults=True):
+        """Typed file metadata block."""
+        version: Optional[str] = None
+        author: Optional[str] = None
+        description: Optional[str] = None
+
+    class ParameterFile(msgspec.Struct, rename='camel', omit_defaults=True):
+        """Typed parameter file (mirrors PARAMETER_FILE_SCHEMA)."""
+        filename: str
+        filepath: str
+        file_type: FileTypeName
+        extracted_at: str
+        graphs: List[Graph]
+        metadata: Optional[FileMetadata] = None
+
+    _ENCODER = msgspec.json.Encoder()
+
+
 class ParameterSchema:
     """
     Utility class for working with parameter file schemas.
@@ -123,6 +236,43 @@ class ParameterSchema:
         """Get the JSON schema for parameter files."""
         return PARAMETER_FILE_SCHEMA
     
+    @staticmethod
+    def encode(data: Any) -> bytes:
+        """
+        Serialize a parameter file (dict or ParameterFile) to JSON bytes.
+        
+        Uses msgspec's compiled encoder when available.
+        
+        Args:
+            data: Parameter file data.
+            
+        Returns:
+            UTF-8 encoded JSON.
+        """
+        if msgspec is not None:
+            return _ENCODER.encode(data)
+        return json.dumps(data, ensure_ascii=False).encode('utf-8')
+    
+    @staticmethod
+    def decode(raw: bytes) -> Any:
+        """
+        Parse and validate a parameter file from JSON bytes.
+        
+        Args:
+            raw: JSON content.
+            
+        Returns:
+            ParameterFile if msgspec is installed, otherwise a dictionary.
+        """
+        if msgspec is not None:
+            try:
+                return msgspec.json.decode(raw, type=ParameterFile)
+            except msgspec.ValidationError as e:
+                raise ValueError(f"Schema validation failed: {e}")
+        data = json.loads(raw)
+        ParameterSchema.validate(data)
+        return data
+    
     @staticmethod
     def validate(data: Dict[str, Any]) -> bool:
         """
@@ -134,6 +284,13 @@ class ParameterSchema:
         Returns:
             True if valid, raises exception if invalid.
         """
+        if msgspec is not None:
+            try:
+                msgspec.convert(data, ParameterFile)
+                return True
+            except msgspec.ValidationError as e:
+                raise ValueError(f"Schema validation failed: {e}")
+        
         try:
             import jsonschema
             jsonschema.validate(data, PARAMETER_FILE_SCHEMA)
@@ -7,30 +7,64 @@ Creates and configures the Flask application for the asset repository.
 import os
 import sys
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from flask import Flask, jsonify, send_from_directory
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to Flask's encoder
+    orjson = None
+
+# Base directory of the sat_tools package
+_BASE_PATH = Path(__file__).resolve().parent.parent
+_LOG_DIR = _BASE_PATH / 'logs'
+
 # Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(_BASE_PATH))
 
+from .cache import LRUStore
 from .models import Database
 from .storage import StorageService
 from .routes import assets_bp, parameters_bp, thumbnails_bp
 
 
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    JSON provider backed by orjson, so every jsonify() call uses it.
+    
+    Types orjson cannot encode fall back to Flask's default handling.
+    """
+    
+    _OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS if orjson else 0
+    
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=self.default, option=self._OPTIONS).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self._OPTIONS),
+            mimetype=self.mimetype
+        )
+
+
 def setup_logging(app: Flask):
     """Setup logging configuration."""
     # Create logs directory
-    log_dir = Path(__file__).parent.parent / 'logs'
-    log_dir.mkdir(exist_ok=True)
+    _LOG_DIR.mkdir(exist_ok=True)
     
     # Configure logging format
     log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     
     # File handler
     file_handler = logging.FileHandler(
-        log_dir / 'sat_server.log',
+        _LOG_DIR / 'sat_server.log',
         encoding='utf-8'
     )
     file_handler.setLevel(logging.DEBUG)
@@ -64,6 +98,8 @@ def create_app(config: dict = None) -> Flask:
         Configured Flask application.
     """
     app = Flask(__name__)
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
     
     # Setup logging first
     setup_logging(app)
@@ -71,11 +107,13 @@ def create_app(config: dict = None) -> Flask:
     logging.info("Creating Flask application")
     
     # Default configuration
-    base_path = Path(__file__).parent.parent
-    app.config['DATABASE_PATH'] = str(base_path / 'assets.db')
-    app.config['STORAGE_PATH'] = str(base_path / 'storage')
+    app.config['DATABASE_PATH'] = str(_BASE_PATH / 'assets.db')
+    app.config['STORAGE_PATH'] = str(_BASE_PATH / 'storage')
     app.config['STATIC_URL_PREFIX'] = '/static/assets'
     app.config['MAX_CONTENT_LENGTH'] = 500 * 1024 * 1024  # 500MB max upload
+    app.config['AUTO_PROCESS_WORKERS'] = 2
+    # sbsrender processes run at once for /api/thumbnails/batch, across all requests
+    app.config['BATCH_WORKERS'] = os.cpu_count() or 4
     
     # Override with provided config
     if config:
@@ -98,6 +136,19 @@ def create_app(config: dict = None) -> Flask:
     app.config['storage'] = StorageService(storage_path, url_prefix)
     logging.info("Storage service initialized")
     
+    # Background pool for post-upload processing (sbscooker/sbsrender run
+    # as subprocesses, so threads are enough to overlap them)
+    app.config['auto_process_pool'] = ThreadPoolExecutor(
+        max_workers=app.config['AUTO_PROCESS_WORKERS'],
+        thread_name_prefix='auto-process'
+    )
+    app.config['batch_pool'] = ThreadPoolExecutor(
+        max_workers=app.config['BATCH_WORKERS'],
+        thread_name_prefix='thumbnail-batch'
+    )
+    # Bounded, so statuses of long-finished uploads are eventually evicted
+    app.config['auto_process_status'] = LRUStore(maxsize=2048)
+    
     # Register blueprints
     app.register_blueprint(assets_bp)
     app.register_blueprint(parameters_bp)
@@ -0,0 +1,73 @@
+"""
+Cache Utilities
+
+Bounded in-memory stores shared between request threads.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+
+
+class LRUStore:
+    """
+    Thread-safe key/value store that evicts the least recently used
+    entry once it holds more than ``maxsize`` items.
+    """
+    
+    def __init__(self, maxsize: int = 2048):
+        """
+        Initialize the store.
+        
+        Args:
+            maxsize: Maximum number of entries kept.
+        """
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.RLock()
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get an entry, marking it as recently used."""
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+    
+    def set(self, key: str, value: Any):
+        """Add or replace an entry, evicting the oldest if over capacity."""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._removed(*self._data.popitem(last=False))
+    
+    def delete(self, key: str) -> Optional[Any]:
+        """Remove an entry, returning it (or None if it was not present)."""
+        with self._lock:
+            value = self._data.pop(key, None)
+            if value is not None:
+                self._removed(key, value)
+            return value
+    
+    def _removed(self, key: str, value: Any):
+        """Hook called (under the lock) when an entry is evicted or deleted."""
+    
+    def values(self) -> List[Any]:
+        """Snapshot of all values, least recently used first."""
+        with self._lock:
+            return list(self._data.values())
+    
+    def items(self) -> List[Tuple[str, Any]]:
+        """Snapshot of all (key, value) pairs, least recently used first."""
+        with self._lock:
+            return list(self._data.items())
+    
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._data
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
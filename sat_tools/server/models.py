@@ -4,11 +4,86 @@ Database Models
 Defines SQLAlchemy models for the asset repository database.
 """
 
-import uuid
-from datetime import datetime
-from typing import List, Optional
+import atexit
+import json
+import logging
+import secrets
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
 from dataclasses import dataclass, field
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the json module
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+def _set_field(obj, name: str, value, iso_fields: Dict[str, str]):
+    """
+    Set a model attribute, dropping the cached to_dict()/to_json() results
+    and refreshing the cached ISO string for datetime fields.
+    """
+    object.__setattr__(obj, name, value)
+    object.__setattr__(obj, '_dict_cache', None)
+    object.__setattr__(obj, '_json_cache', None)
+    iso_name = iso_fields.get(name)
+    if iso_name is not None:
+        if value is not None and value.tzinfo is not None:
+            # Timestamps are naive UTC; keep aware inputs from changing to_dict()
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+            object.__setattr__(obj, name, value)
+        object.__setattr__(obj, iso_name, value.isoformat() if value else None)
+
+
+def _dumps(data) -> bytes:
+    """Encode compact JSON, with orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+# Shared tag strings; assets loaded from SQLite reuse one object per tag
+_tag_pool: Dict[str, str] = {}
+
+
+def _intern_tags(tags: List[str]) -> List[str]:
+    """Map each tag through the shared tag pool."""
+    pool = _tag_pool.setdefault
+    return [pool(tag, tag) for tag in tags]
+
+
+def _utcnow() -> datetime:
+    """Current UTC time as a naive datetime, the form timestamps are kept in."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _dt_to_us(value: datetime) -> int:
+    """Convert a datetime to Unix epoch microseconds (naive values are taken as UTC)."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def _us_to_dt(value: int) -> datetime:
+    """Convert Unix epoch microseconds to a naive UTC datetime."""
+    return _EPOCH + timedelta(microseconds=value)
+
+
+def _iso_to_us(value: Optional[str]) -> Optional[int]:
+    """Convert a stored ISO timestamp to epoch microseconds (for migrations)."""
+    return _dt_to_us(datetime.fromisoformat(value)) if value else None
+
 
 @dataclass
 class Asset:
@@ -29,6 +104,27 @@ class Asset:
     has_parameters: bool = False
     has_thumbnail: bool = False
     has_baked_textures: bool = False
+    # SHA-256 of the source file, used to detect duplicate uploads
+    content_hash: Optional[str] = None
+    
+    # ISO strings kept in sync with the datetime fields for to_dict()
+    _ISO_FIELDS = {'created_at': 'created_at_iso', 'updated_at': 'updated_at_iso'}
+    # Fields matched by text search, folded into search_blob
+    _SEARCH_FIELDS = frozenset(('name', 'description', 'source_file'))
+    
+    def __setattr__(self, name, value):
+        _set_field(self, name, value, self._ISO_FIELDS)
+        if name in self._SEARCH_FIELDS:
+            object.__setattr__(self, '_search_blob', None)
+    
+    @property
+    def search_blob(self) -> str:
+        """Lowercased name, description and source file, one per line."""
+        blob = self._search_blob
+        if blob is None:
+            blob = f"{self.name}\n{self.description}\n{self.source_file}".lower()
+            object.__setattr__(self, '_search_blob', blob)
+        return blob
     
     @classmethod
     def create(
@@ -47,9 +143,9 @@ class Asset:
         has_baked_textures: bool = False
     ) -> 'Asset':
         """Create a new asset."""
-        now = datetime.utcnow()
+        now = _utcnow()
         return cls(
-            id=str(uuid.uuid4()),
+            id=secrets.token_hex(16),
             name=name,
             description=description,
             source_file=source_file,
@@ -67,7 +163,22 @@ class Asset:
         )
     
     def to_dict(self) -> dict:
-        """Convert to dictionary."""
+        """Convert to dictionary (a shallow copy of the cached result)."""
+        cached = self._dict_cache
+        if cached is None:
+            cached = self._build_dict()
+            object.__setattr__(self, '_dict_cache', cached)
+        return dict(cached)
+    
+    def to_json(self) -> bytes:
+        """Serialized to_dict() output, cached until the instance changes."""
+        cached = self._json_cache
+        if cached is None:
+            cached = _dumps(self._dict_cache or self.to_dict())
+            object.__setattr__(self, '_json_cache', cached)
+        return cached
+    
+    def _build_dict(self) -> dict:
         return {
             'id': self.id,
             'name': self.name,
@@ -78,8 +189,8 @@ class Asset:
             'storagePath': self.storage_path,
             'thumbnailUrl': self.thumbnail_url,
             'tags': self.tags,
-            'createdAt': self.created_at.isoformat() if self.created_at else None,
-            'updatedAt': self.updated_at.isoformat() if self.updated_at else None,
+            'createdAt': self.created_at_iso,
+            'updatedAt': self.updated_at_iso,
             'metadata': self.metadata,
             'hasParameters': self.has_parameters,
             'hasThumbnail': self.has_thumbnail,
@@ -101,6 +212,11 @@ class Texture:
     height: int
     created_at: datetime
     
+    _ISO_FIELDS = {'created_at': 'created_at_iso'}
+    
+    def __setattr__(self, name, value):
+        _set_field(self, name, value, self._ISO_FIELDS)
+    
     @classmethod
     def create(
         cls,
@@ -115,7 +231,7 @@ class Texture:
     ) -> 'Texture':
         """Create a new texture."""
         return cls(
-            id=str(uuid.uuid4()),
+            id=secrets.token_hex(16),
             asset_id=asset_id,
             channel=channel,
             filename=filename,
@@ -124,11 +240,26 @@ class Texture:
             format=format,
             width=width,
             height=height,
-            created_at=datetime.utcnow()
+            created_at=_utcnow()
         )
     
     def to_dict(self) -> dict:
-        """Convert to dictionary."""
+        """Convert to dictionary (a shallow copy of the cached result)."""
+        cached = self._dict_cache
+        if cached is None:
+            cached = self._build_dict()
+            object.__setattr__(self, '_dict_cache', cached)
+        return dict(cached)
+    
+    def to_json(self) -> bytes:
+        """Serialized to_dict() output, cached until the instance changes."""
+        cached = self._json_cache
+        if cached is None:
+            cached = _dumps(self._dict_cache or self.to_dict())
+            object.__setattr__(self, '_json_cache', cached)
+        return cached
+    
+    def _build_dict(self) -> dict:
         return {
             'id': self.id,
             'assetId': self.asset_id,
@@ -143,28 +274,224 @@ class Texture:
         }
 
 
+def _escape_like(value: str) -> str:
+    """Escape LIKE wildcards so user input matches literally."""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
 class Database:
     """
     Simple in-memory database with SQLite persistence.
+    
+    A single SQLite connection is kept open for the lifetime of the
+    instance and shared between request threads under a lock.
+    
+    The database runs in WAL mode, so SQLite keeps ``-wal`` and ``-shm``
+    sidecar files next to the database file while it is open.
+    
+    Saves update the in-memory cache immediately and are written to SQLite
+    by a background thread in batches. Call ``flush()`` to force pending
+    rows to disk; ``close()`` does so automatically.
     """
     
+    _ASSET_UPSERT_SQL = '''
+        INSERT OR REPLACE INTO assets 
+        (id, name, description, source_file, source_file_url, file_type,
+         storage_path, thumbnail_url, tags, created_at, updated_at, metadata,
+         has_parameters, has_thumbnail, has_baked_textures, search_text, content_hash)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+    
+    _TEXTURE_UPSERT_SQL = '''
+        INSERT OR REPLACE INTO textures 
+        (id, asset_id, channel, filename, storage_path, url, 
+         format, width, height, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+    
+    # Applied once per connection
+    _PRAGMAS = (
+        'PRAGMA journal_mode=WAL',
+        'PRAGMA synchronous=NORMAL',
+        'PRAGMA temp_store=MEMORY',
+        'PRAGMA cache_size=-20000',
+    )
+    
+    # Seconds between background flushes of pending saves
+    _FLUSH_INTERVAL = 0.1
+    
     def __init__(self, db_path: str = "assets.db"):
         """Initialize the database."""
         self.db_path = db_path
         self.assets: dict = {}
         self.textures: dict = {}
+        # Secondary index over the in-memory texture cache
+        self._textures_by_asset: Dict[str, Dict[str, Texture]] = {}
+        # content_hash -> IDs of assets sharing that source file content
+        self._assets_by_hash: Dict[str, Dict[str, None]] = {}
+        self._lock = threading.RLock()
+        # Write-behind queues of row parameters, keyed by ID so repeated
+        # saves coalesce
+        self._pending_assets: Dict[str, tuple] = {}
+        self._pending_textures: Dict[str, tuple] = {}
+        # (search, tags) -> (total, expires_at); cleared on every asset write
+        self._count_cache: Dict[tuple, tuple] = {}
+        self._conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=256
+        )
+        for pragma in self._PRAGMAS:
+            self._conn.execute(pragma)
         self._init_db()
+        
+        self._closed = threading.Event()
+        self._flush_thread = threading.Thread(
+            target=self._flush_loop, name='database-flush', daemon=True
+        )
+        self._flush_thread.start()
+        atexit.register(self.close)
+    
+    def close(self):
+        """Flush pending saves and close the SQLite connection."""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._flush_thread.join()
+        with self._lock:
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Pending database writes lost on close")
+            self._conn.close()
+        atexit.unregister(self.close)
+    
+    def _flush_loop(self):
+        """Periodically write pending saves until the database is closed."""
+        while not self._closed.wait(self._FLUSH_INTERVAL):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to flush pending database writes")
+    
+    def flush(self):
+        """Write all pending asset and texture saves in one transaction."""
+        with self._lock:
+            if not self._pending_assets and not self._pending_textures:
+                return
+            assets, self._pending_assets = self._pending_assets, {}
+            textures, self._pending_textures = self._pending_textures, {}
+            try:
+                self._write_rows(list(assets.values()), list(textures.values()))
+            except sqlite3.OperationalError:
+                # Locked or I/O trouble; keep the rows queued for the next attempt
+                self._pending_assets = assets
+                self._pending_textures = textures
+                raise
+            except Exception:
+                # Some row can never be written; isolate it so the rest still land
+                logger.exception("Batch write failed; retrying rows individually")
+                self._write_rows_individually(assets, textures)
+    
+    def _flush_quietly(self):
+        """
+        Flush before a read, logging instead of raising on failure.
+        
+        The unwritten rows stay queued; the read then sees the last written
+        state rather than failing over writes it has nothing to do with.
+        """
+        try:
+            self.flush()
+        except sqlite3.Error:
+            logger.exception("Failed to flush pending database writes")
+    
+    def _write_rows(self, asset_rows: List[tuple], texture_rows: List[tuple]):
+        """Upsert asset and texture rows in a single transaction."""
+        with self._transaction() as cursor:
+            if asset_rows:
+                cursor.executemany(self._ASSET_UPSERT_SQL, asset_rows)
+            if texture_rows:
+                cursor.executemany(self._TEXTURE_UPSERT_SQL, texture_rows)
+    
+    def _write_rows_individually(self, assets: Dict[str, tuple], textures: Dict[str, tuple]):
+        """
+        Write rows one at a time. Rows that still fail are dropped, and the
+        in-memory cache reverts to what SQLite holds for them.
+        """
+        for asset_id, row in assets.items():
+            try:
+                self._write_rows([row], [])
+            except Exception:
+                logger.exception("Dropping unwritable asset row %s", asset_id)
+                self._reload_asset(asset_id)
+        for texture_id, row in textures.items():
+            try:
+                self._write_rows([], [row])
+            except Exception:
+                logger.exception("Dropping unwritable texture row %s", texture_id)
+                self._reload_texture(texture_id)
+    
+    def _reload_asset(self, asset_id: str):
+        """Replace a cached asset with its stored row, or evict it if there is none."""
+        self._unindex_asset(asset_id)
+        try:
+            row = self._conn.execute(f'{self._ASSET_SELECT_SQL} WHERE id = ?', (asset_id,)).fetchone()
+        except sqlite3.Error:
+            logger.exception("Failed to reload asset %s", asset_id)
+            return
+        if row is not None:
+            self._index_asset(self._asset_from_row(row))
+        self._count_cache.clear()
+    
+    def _reload_texture(self, texture_id: str):
+        """Replace a cached texture with its stored row, or evict it if there is none."""
+        old = self.textures.pop(texture_id, None)
+        if old is not None:
+            self._textures_by_asset.get(old.asset_id, {}).pop(texture_id, None)
+        try:
+            row = self._conn.execute(f'{self._TEXTURE_SELECT_SQL} WHERE id = ?', (texture_id,)).fetchone()
+        except sqlite3.Error:
+            logger.exception("Failed to reload texture %s", texture_id)
+            return
+        if row is not None:
+            self._index_texture(self._texture_from_row(row))
+    
+    @contextmanager
+    def _transaction(self):
+        """Run the enclosed statements in a single transaction."""
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute('BEGIN')
+            try:
+                yield cursor
+            except BaseException:
+                cursor.execute('ROLLBACK')
+                raise
+            else:
+                cursor.execute('COMMIT')
+    
+    # Columns added after the initial assets schema (migration)
+    _ASSET_MIGRATIONS = (
+        ('source_file_url', 'TEXT'),
+        ('file_type', 'TEXT DEFAULT "sbs"'),
+        ('has_parameters', 'INTEGER DEFAULT 0'),
+        ('has_thumbnail', 'INTEGER DEFAULT 0'),
+        ('has_baked_textures', 'INTEGER DEFAULT 0'),
+        ('search_text', 'TEXT'),
+        ('content_hash', 'TEXT'),
+    )
     
     def _init_db(self):
         """Initialize the SQLite database."""
-        import sqlite3
+        with self._transaction() as cursor:
+            self._create_schema(cursor)
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Create assets table with new columns
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS assets (
+        # Load existing data
+        self._load_data()
+    
+    _ASSETS_TABLE_SQL = '''
+            CREATE TABLE IF NOT EXISTS {table} (
                 id TEXT PRIMARY KEY,
                 name TEXT NOT NULL,
                 description TEXT,
@@ -174,44 +501,19 @@ class Database:
                 storage_path TEXT,
                 thumbnail_url TEXT,
                 tags TEXT,
-                created_at TEXT,
-                updated_at TEXT,
+                created_at INTEGER,
+                updated_at INTEGER,
                 metadata TEXT,
                 has_parameters INTEGER DEFAULT 0,
                 has_thumbnail INTEGER DEFAULT 0,
-                has_baked_textures INTEGER DEFAULT 0
+                has_baked_textures INTEGER DEFAULT 0,
+                search_text TEXT,
+                content_hash TEXT
             )
-        ''')
-        
-        # Add new columns if they don't exist (migration)
-        try:
-            cursor.execute('ALTER TABLE assets ADD COLUMN source_file_url TEXT')
-        except sqlite3.OperationalError:
-            pass  # Column already exists
-        
-        try:
-            cursor.execute('ALTER TABLE assets ADD COLUMN file_type TEXT DEFAULT "sbs"')
-        except sqlite3.OperationalError:
-            pass
-        
-        try:
-            cursor.execute('ALTER TABLE assets ADD COLUMN has_parameters INTEGER DEFAULT 0')
-        except sqlite3.OperationalError:
-            pass
-        
-        try:
-            cursor.execute('ALTER TABLE assets ADD COLUMN has_thumbnail INTEGER DEFAULT 0')
-        except sqlite3.OperationalError:
-            pass
-        
-        try:
-            cursor.execute('ALTER TABLE assets ADD COLUMN has_baked_textures INTEGER DEFAULT 0')
-        except sqlite3.OperationalError:
-            pass
-        
-        # Create textures table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS textures (
+    '''
+    
+    _TEXTURES_TABLE_SQL = '''
+            CREATE TABLE IF NOT EXISTS {table} (
                 id TEXT PRIMARY KEY,
                 asset_id TEXT NOT NULL,
                 channel TEXT,
@@ -221,84 +523,172 @@ class Database:
                 format TEXT,
                 width INTEGER,
                 height INTEGER,
-                created_at TEXT,
+                created_at INTEGER,
                 FOREIGN KEY (asset_id) REFERENCES assets (id)
             )
-        ''')
-        
-        conn.commit()
-        conn.close()
-        
-        # Load existing data
-        self._load_data()
+    '''
     
-    def _load_data(self):
-        """Load data from SQLite."""
-        import sqlite3
-        import json
-        
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Enable column access by name
-        cursor = conn.cursor()
+    def _create_schema(self, cursor: sqlite3.Cursor):
+        """Create tables and add any missing columns."""
+        cursor.execute(self._ASSETS_TABLE_SQL.format(table='assets'))
         
-        # Load assets
-        cursor.execute('SELECT * FROM assets')
-        for row in cursor.fetchall():
-            asset = Asset(
-                id=row['id'],
-                name=row['name'],
-                description=row['description'] or '',
-                source_file=row['source_file'] or '',
-                source_file_url=row['source_file_url'] if 'source_file_url' in row.keys() else None,
-                file_type=row['file_type'] if 'file_type' in row.keys() else 'sbs',
-                storage_path=row['storage_path'] or '',
-                thumbnail_url=row['thumbnail_url'],
-                tags=json.loads(row['tags']) if row['tags'] else [],
-                created_at=datetime.fromisoformat(row['created_at']) if row['created_at'] else datetime.utcnow(),
-                updated_at=datetime.fromisoformat(row['updated_at']) if row['updated_at'] else datetime.utcnow(),
-                metadata=json.loads(row['metadata']) if row['metadata'] else {},
-                has_parameters=bool(row['has_parameters']) if 'has_parameters' in row.keys() else False,
-                has_thumbnail=bool(row['has_thumbnail']) if 'has_thumbnail' in row.keys() else False,
-                has_baked_textures=bool(row['has_baked_textures']) if 'has_baked_textures' in row.keys() else False
+        # Add new columns if they don't exist (migration)
+        existing = {row[1] for row in cursor.execute('PRAGMA table_info(assets)')}
+        for column, column_type in self._ASSET_MIGRATIONS:
+            if column not in existing:
+                cursor.execute(f'ALTER TABLE assets ADD COLUMN {column} {column_type}')
+        if 'search_text' not in existing:
+            # Fold case in Python like Asset.search_blob; SQLite's lower()
+            # only handles ASCII
+            rows = cursor.execute(
+                'SELECT id, name, description, source_file FROM assets'
+            ).fetchall()
+            cursor.executemany(
+                'UPDATE assets SET search_text = ? WHERE id = ?',
+                [
+                    (f"{name or ''}\n{description or ''}\n{source_file or ''}".lower(), asset_id)
+                    for asset_id, name, description, source_file in rows
+                ]
             )
-            self.assets[asset.id] = asset
         
-        # Load textures
-        cursor.execute('SELECT * FROM textures')
-        for row in cursor.fetchall():
-            texture = Texture(
-                id=row['id'],
-                asset_id=row['asset_id'],
-                channel=row['channel'] or '',
-                filename=row['filename'] or '',
-                storage_path=row['storage_path'] or '',
-                url=row['url'] or '',
-                format=row['format'] or 'png',
-                width=row['width'] or 2048,
-                height=row['height'] or 2048,
-                created_at=datetime.fromisoformat(row['created_at']) if row['created_at'] else datetime.utcnow()
-            )
-            self.textures[texture.id] = texture
+        cursor.execute(self._TEXTURES_TABLE_SQL.format(table='textures'))
+        
+        # Older databases stored timestamps as ISO strings
+        self._migrate_timestamps(cursor, 'assets', self._ASSETS_TABLE_SQL, ('created_at', 'updated_at'))
+        self._migrate_timestamps(cursor, 'textures', self._TEXTURES_TABLE_SQL, ('created_at',))
         
-        conn.close()
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_assets_created ON assets (created_at DESC)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_textures_asset ON textures (asset_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_assets_content_hash ON assets (content_hash)')
     
-    def save_asset(self, asset: Asset):
-        """Save an asset to the database."""
-        import sqlite3
-        import json
+    @staticmethod
+    def _migrate_timestamps(cursor: sqlite3.Cursor, table: str, table_sql: str, columns: tuple):
+        """Rebuild a table whose timestamp columns are still TEXT as epoch microseconds."""
+        column_types = {row[1]: row[2] for row in cursor.execute(f'PRAGMA table_info({table})')}
+        if all(column_types.get(column, '').upper() == 'INTEGER' for column in columns):
+            return
         
-        self.assets[asset.id] = asset
+        # Parse in Python; julianday() arithmetic cannot keep microseconds
+        cursor.connection.create_function('iso_to_us', 1, _iso_to_us, deterministic=True)
+        selects = [
+            f'iso_to_us({name})' if name in columns else name
+            for name in column_types
+        ]
+        cursor.execute(table_sql.format(table=f'{table}_new'))
+        cursor.execute(
+            f'INSERT INTO {table}_new ({", ".join(column_types)}) '
+            f'SELECT {", ".join(selects)} FROM {table}'
+        )
+        cursor.execute(f'DROP TABLE {table}')
+        cursor.execute(f'ALTER TABLE {table}_new RENAME TO {table}')
+    
+    # Columns in a fixed order for positional unpacking
+    _ASSET_SELECT_SQL = '''
+        SELECT id, name, description, source_file, source_file_url, file_type,
+               storage_path, thumbnail_url, tags, created_at, updated_at, metadata,
+               has_parameters, has_thumbnail, has_baked_textures, content_hash
+        FROM assets
+    '''
+    
+    _TEXTURE_SELECT_SQL = '''
+        SELECT id, asset_id, channel, filename, storage_path, url,
+               format, width, height, created_at
+        FROM textures
+    '''
+    
+    @staticmethod
+    def _asset_from_row(row: tuple) -> Asset:
+        """Build an Asset from a row of _ASSET_SELECT_SQL."""
+        (asset_id, name, description, source_file, source_file_url, file_type,
+         storage_path, thumbnail_url, tags, created_at, updated_at, metadata,
+         has_parameters, has_thumbnail, has_baked_textures, content_hash) = row
+        return Asset(
+            id=asset_id,
+            name=name,
+            description=description or '',
+            source_file=source_file or '',
+            source_file_url=source_file_url,
+            file_type=sys.intern(file_type or 'sbs'),
+            storage_path=storage_path or '',
+            thumbnail_url=thumbnail_url,
+            tags=_intern_tags(json.loads(tags)) if tags else [],
+            created_at=_us_to_dt(created_at) if created_at is not None else _utcnow(),
+            updated_at=_us_to_dt(updated_at) if updated_at is not None else _utcnow(),
+            metadata=json.loads(metadata) if metadata else {},
+            has_parameters=bool(has_parameters),
+            has_thumbnail=bool(has_thumbnail),
+            has_baked_textures=bool(has_baked_textures),
+            content_hash=content_hash
+        )
+    
+    @staticmethod
+    def _texture_from_row(row: tuple) -> Texture:
+        """Build a Texture from a row of _TEXTURE_SELECT_SQL."""
+        (texture_id, asset_id, channel, filename, storage_path, url,
+         format, width, height, created_at) = row
+        return Texture(
+            id=texture_id,
+            asset_id=asset_id,
+            channel=sys.intern(channel or ''),
+            filename=filename or '',
+            storage_path=storage_path or '',
+            url=url or '',
+            format=sys.intern(format or 'png'),
+            width=width or 2048,
+            height=height or 2048,
+            created_at=_us_to_dt(created_at) if created_at is not None else _utcnow()
+        )
+    
+    _LOAD_BATCH_SIZE = 1000
+    
+    def _load_data(self):
+        """Load data from SQLite."""
+        cursor = self._conn.cursor()
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor.execute(self._ASSET_SELECT_SQL)
+        while True:
+            rows = cursor.fetchmany(self._LOAD_BATCH_SIZE)
+            if not rows:
+                break
+            for row in rows:
+                self._index_asset(self._asset_from_row(row))
         
-        cursor.execute('''
-            INSERT OR REPLACE INTO assets 
-            (id, name, description, source_file, source_file_url, file_type,
-             storage_path, thumbnail_url, tags, created_at, updated_at, metadata,
-             has_parameters, has_thumbnail, has_baked_textures)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        cursor.execute(self._TEXTURE_SELECT_SQL)
+        while True:
+            rows = cursor.fetchmany(self._LOAD_BATCH_SIZE)
+            if not rows:
+                break
+            for row in rows:
+                self._index_texture(self._texture_from_row(row))
+    
+    def _index_asset(self, asset: Asset):
+        """Add or refresh an asset in the in-memory cache and indices."""
+        self.assets[asset.id] = asset
+        if asset.content_hash:
+            self._assets_by_hash.setdefault(asset.content_hash, {})[asset.id] = None
+    
+    def _unindex_asset(self, asset_id: str) -> Optional[Asset]:
+        """Remove an asset (not its textures) from the cache and indices."""
+        asset = self.assets.pop(asset_id, None)
+        if asset is not None and asset.content_hash:
+            sharing = self._assets_by_hash.get(asset.content_hash, {})
+            sharing.pop(asset_id, None)
+            if not sharing:
+                self._assets_by_hash.pop(asset.content_hash, None)
+        return asset
+    
+    def _index_texture(self, texture: Texture):
+        """Add or refresh a texture in the in-memory cache and indices."""
+        old = self.textures.get(texture.id)
+        if old is not None and old.asset_id != texture.asset_id:
+            self._textures_by_asset.get(old.asset_id, {}).pop(texture.id, None)
+        self.textures[texture.id] = texture
+        self._textures_by_asset.setdefault(texture.asset_id, {})[texture.id] = texture
+    
+    @staticmethod
+    def _asset_row(asset: Asset) -> tuple:
+        """Build the INSERT parameters for an asset."""
+        return (
             asset.id,
             asset.name,
             asset.description,
@@ -308,32 +698,20 @@ class Database:
             asset.storage_path,
             asset.thumbnail_url,
             json.dumps(asset.tags),
-            asset.created_at.isoformat() if asset.created_at else None,
-            asset.updated_at.isoformat() if asset.updated_at else None,
+            _dt_to_us(asset.created_at),
+            _dt_to_us(asset.updated_at),
             json.dumps(asset.metadata),
             1 if asset.has_parameters else 0,
             1 if asset.has_thumbnail else 0,
-            1 if asset.has_baked_textures else 0
-        ))
-        
-        conn.commit()
-        conn.close()
+            1 if asset.has_baked_textures else 0,
+            asset.search_blob,
+            asset.content_hash
+        )
     
-    def save_texture(self, texture: Texture):
-        """Save a texture to the database."""
-        import sqlite3
-        
-        self.textures[texture.id] = texture
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO textures 
-            (id, asset_id, channel, filename, storage_path, url, 
-             format, width, height, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+    @staticmethod
+    def _texture_row(texture: Texture) -> tuple:
+        """Build the INSERT parameters for a texture."""
+        return (
             texture.id,
             texture.asset_id,
             texture.channel,
@@ -343,11 +721,57 @@ class Database:
             texture.format,
             texture.width,
             texture.height,
-            texture.created_at.isoformat() if texture.created_at else None
-        ))
+            _dt_to_us(texture.created_at)
+        )
+    
+    def save_asset(self, asset: Asset):
+        """Save an asset to the database."""
+        self.save_assets([asset])
+    
+    def save_assets(self, assets: List[Asset]):
+        """Save several assets; they are written by the next flush."""
+        # Serialize up front so unencodable fields raise here, not in the flush
+        rows = [self._asset_row(asset) for asset in assets]
+        with self._lock:
+            for asset, row in zip(assets, rows):
+                # Fields may have been mutated in place (tags, metadata)
+                asset._dict_cache = None
+                self._index_asset(asset)
+                self._pending_assets[asset.id] = row
+            self._count_cache.clear()
+    
+    def save_asset_if_present(self, asset: Asset) -> bool:
+        """
+        Save an asset only if its ID is still in the database.
         
-        conn.commit()
-        conn.close()
+        The check and the queued write happen under one lock hold, so a
+        concurrent ``delete_assets`` cannot be undone by this save.
+        
+        Returns:
+            True if the asset was saved, False if it has been deleted.
+        """
+        row = self._asset_row(asset)
+        with self._lock:
+            if asset.id not in self.assets:
+                return False
+            asset._dict_cache = None
+            self._index_asset(asset)
+            self._pending_assets[asset.id] = row
+            self._count_cache.clear()
+        return True
+    
+    def save_texture(self, texture: Texture):
+        """Save a texture to the database."""
+        self.save_textures([texture])
+    
+    def save_textures(self, textures: List[Texture]):
+        """Save several textures; they are written by the next flush."""
+        rows = [self._texture_row(texture) for texture in textures]
+        with self._lock:
+            for texture, row in zip(textures, rows):
+                texture._dict_cache = None
+                self._index_texture(texture)
+                self._pending_textures[texture.id] = row
     
     def get_asset(self, asset_id: str) -> Optional[Asset]:
         """Get an asset by ID."""
@@ -360,55 +784,131 @@ class Database:
         search: Optional[str] = None,
         tags: Optional[List[str]] = None
     ) -> tuple:
-        """Get paginated list of assets."""
-        assets = list(self.assets.values())
+        """
+        Get paginated list of assets.
+        
+        Filtering, ordering and pagination run in SQLite; matching rows
+        are returned as the cached Asset objects.
+        """
+        where = []
+        params: list = []
         
         # Filter by search
         if search:
-            search_lower = search.lower()
-            assets = [a for a in assets if 
-                      search_lower in a.name.lower() or 
-                      search_lower in a.description.lower() or
-                      search_lower in a.source_file.lower()]
+            where.append("search_text LIKE ? ESCAPE '\\'")
+            params.append('%' + _escape_like(search.lower()) + '%')
         
         # Filter by tags
         if tags:
-            assets = [a for a in assets if 
-                      any(t in a.tags for t in tags)]
+            placeholders = ','.join('?' * len(tags))
+            where.append(
+                f'EXISTS (SELECT 1 FROM json_each(assets.tags) WHERE value IN ({placeholders}))'
+            )
+            params.extend(tags)
         
-        # Sort by created_at descending
-        assets.sort(key=lambda a: a.created_at, reverse=True)
+        where_sql = f" WHERE {' AND '.join(where)}" if where else ''
+        offset = max(page - 1, 0) * page_size
+        count_key = (search or '', tuple(sorted(tags)) if tags else ())
         
-        # Paginate
-        total = len(assets)
-        start = (page - 1) * page_size
-        end = start + page_size
+        with self._lock:
+            self._flush_quietly()
+            total = self._count_assets(count_key, where_sql, params)
+            rows = self._conn.execute(
+                f'SELECT id FROM assets{where_sql} ORDER BY created_at DESC LIMIT ? OFFSET ?',
+                params + [max(page_size, 0), offset]
+            ).fetchall()
         
-        return assets[start:end], total
+        assets = [self.assets[row[0]] for row in rows if row[0] in self.assets]
+        return assets, total
+    
+    # Totals below this are cheap enough to recount on every page
+    _COUNT_CACHE_MIN_TOTAL = 1000
+    _COUNT_CACHE_TTL = 60.0
+    _COUNT_CACHE_SIZE = 512
+    
+    def _count_assets(self, key: tuple, where_sql: str, params: list) -> int:
+        """Count the assets matching a filter, caching large totals briefly."""
+        now = time.monotonic()
+        cached = self._count_cache.get(key)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+        
+        total = self._conn.execute(
+            f'SELECT COUNT(*) FROM assets{where_sql}', params
+        ).fetchone()[0]
+        if total >= self._COUNT_CACHE_MIN_TOTAL:
+            if len(self._count_cache) >= self._COUNT_CACHE_SIZE:
+                # Evict the oldest entry
+                del self._count_cache[next(iter(self._count_cache))]
+            self._count_cache[key] = (total, now + self._COUNT_CACHE_TTL)
+        return total
+    
+    def get_asset_by_content_hash(self, content_hash: str) -> Optional[Asset]:
+        """Get an asset whose source file has the given SHA-256, if any."""
+        for asset_id in self._assets_by_hash.get(content_hash, ()):
+            asset = self.assets.get(asset_id)
+            if asset is not None:
+                return asset
+        return None
+    
+    def get_assets_by_content_hash(self, content_hash: str) -> List[Asset]:
+        """Get all assets whose source file has the given SHA-256."""
+        return [
+            self.assets[asset_id]
+            for asset_id in self._assets_by_hash.get(content_hash, ())
+            if asset_id in self.assets
+        ]
     
     def get_textures_for_asset(self, asset_id: str) -> List[Texture]:
         """Get all textures for an asset."""
-        return [t for t in self.textures.values() if t.asset_id == asset_id]
+        return list(self._textures_by_asset.get(asset_id, {}).values())
+    
+    def get_textures_for_assets(self, asset_ids: List[str]) -> Dict[str, List[Texture]]:
+        """Get the textures of several assets in one call, keyed by asset ID."""
+        by_asset = self._textures_by_asset
+        return {
+            asset_id: list(by_asset[asset_id].values())
+            for asset_id in asset_ids
+            if asset_id in by_asset
+        }
+    
+    # Stay well below SQLite's bound-parameter limit
+    _DELETE_CHUNK_SIZE = 500
     
     def delete_asset(self, asset_id: str) -> bool:
         """Delete an asset and its textures."""
-        import sqlite3
-        
-        if asset_id not in self.assets:
-            return False
-        
-        # Delete from memory
-        del self.assets[asset_id]
-        texture_ids = [t.id for t in self.textures.values() if t.asset_id == asset_id]
-        for tid in texture_ids:
-            del self.textures[tid]
+        return self.delete_assets([asset_id]) == 1
+    
+    def delete_assets(self, asset_ids: List[str]) -> int:
+        """
+        Delete several assets and their textures in a single transaction.
         
-        # Delete from database
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM textures WHERE asset_id = ?', (asset_id,))
-        cursor.execute('DELETE FROM assets WHERE id = ?', (asset_id,))
-        conn.commit()
-        conn.close()
+        Args:
+            asset_ids: IDs of the assets to delete. Unknown IDs are ignored.
+            
+        Returns:
+            Number of assets deleted.
+        """
+        with self._lock:
+            ids = [asset_id for asset_id in dict.fromkeys(asset_ids) if asset_id in self.assets]
+            if not ids:
+                return 0
+            
+            # Delete from database first, so a failure leaves the cache intact
+            with self._transaction() as cursor:
+                for i in range(0, len(ids), self._DELETE_CHUNK_SIZE):
+                    chunk = ids[i:i + self._DELETE_CHUNK_SIZE]
+                    placeholders = ','.join('?' * len(chunk))
+                    cursor.execute(f'DELETE FROM textures WHERE asset_id IN ({placeholders})', chunk)
+                    cursor.execute(f'DELETE FROM assets WHERE id IN ({placeholders})', chunk)
+            self._count_cache.clear()
+            
+            # Delete from memory, with any queued saves that would resurrect them
+            for asset_id in ids:
+                self._unindex_asset(asset_id)
+                self._pending_assets.pop(asset_id, None)
+                for tid in self._textures_by_asset.pop(asset_id, {}):
+                    del self.textures[tid]
+                    self._pending_textures.pop(tid, None)
         
-        return True
+        return len(ids)
@@ -11,42 +11,180 @@ from flask import Blueprint, request, jsonify, current_app
 import json
 from pathlib import Path
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Optional
+
+from ..services import get_extractor, get_renderer
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
 
+# Accepted source file extensions (lowercase, without the dot)
+_ALLOWED_EXTS = frozenset({'sbs', 'sbsar'})
+
+
+def _source_file_type(filename: str):
+    """Return 'sbs' or 'sbsar' for an accepted filename, else None."""
+    _, dot, ext = filename.rpartition('.')
+    ext = ext.lower()
+    return ext if dot and ext in _ALLOWED_EXTS else None
+
+
+# sbscooker error signatures, combined so a message is scanned once
+_SBSCOOKER_ERROR_RE = re.compile(
+    r'(?P<pkg>package (?P<pkgname>\S+) could not be found)'
+    r'|(?P<builtin>built-in packages location is not found)'
+    r'|(?P<corrupt>Cannot open the package)'
+)
+# Lower rank wins when a message matches several signatures
+_SBSCOOKER_ERROR_RANK = {'pkg': 0, 'builtin': 1, 'corrupt': 2}
+
+
+def _missing_package_message(match) -> str:
+    # Extract just the filename
+    missing_file = Path(match.group('pkgname')).name
+    return (
+        f"Missing SBS dependency: {missing_file}\n\n"
+        f"This SBS file references an external file '{missing_file}' that does not exist on the server.\n\n"
+        f"Solutions:\n"
+        f"1. Upload all dependency SBS files first\n"
+        f"2. Use compiled SBSAR format (no external dependencies needed)"
+    )
+
+
+_SBSCOOKER_ERROR_FORMATTERS = {
+    'pkg': _missing_package_message,
+    'builtin': lambda match: (
+        "SAT configuration issue: Built-in packages location not found.\n"
+        "Please check if SAT installation path is correctly configured."
+    ),
+    'corrupt': lambda match: (
+        "Cannot open SBS package. The file may be corrupted or in an invalid format."
+    ),
+}
+
+# Upper bound on the size of the upload form's JSON tags field
+_MAX_TAGS_FIELD = 8192
+
+# Only this much of an error message is parsed (and kept as a cache key)
+_ERROR_PARSE_LIMIT = 4096
+
+
 def _parse_sbscooker_error(error_msg: str) -> str:
     """Parse sbscooker error message and return a user-friendly message."""
     if not error_msg:
         return "Unknown error"
     
-    # Check for missing dependency package
-    match = re.search(r'package ([^\s]+) could not be found', error_msg)
-    if match:
-        missing_pkg = match.group(1)
-        # Extract just the filename
-        missing_file = Path(missing_pkg).name
-        return (
-            f"Missing SBS dependency: {missing_file}\n\n"
-            f"This SBS file references an external file '{missing_file}' that does not exist on the server.\n\n"
-            f"Solutions:\n"
-            f"1. Upload all dependency SBS files first\n"
-            f"2. Use compiled SBSAR format (no external dependencies needed)"
-        )
+    # Return original message if no pattern matched
+    return _friendly_sbscooker_error(error_msg[:_ERROR_PARSE_LIMIT]) or error_msg
+
+
+@lru_cache(maxsize=256)
+def _friendly_sbscooker_error(error_msg: str) -> Optional[str]:
+    """
+    Map a (truncated) sbscooker error message to a user-friendly message.
     
-    # Check for other common errors
-    if "built-in packages location is not found" in error_msg:
-        return (
-            "SAT configuration issue: Built-in packages location not found.\n"
-            "Please check if SAT installation path is correctly configured."
-        )
+    The same stderr repeats across retries and across assets sharing a
+    dependency, so results are memoized. Returns None if nothing matched.
+    """
+    best = None
+    for match in _SBSCOOKER_ERROR_RE.finditer(error_msg):
+        if best is None or _SBSCOOKER_ERROR_RANK[match.lastgroup] < _SBSCOOKER_ERROR_RANK[best.lastgroup]:
+            best = match
+            if _SBSCOOKER_ERROR_RANK[match.lastgroup] == 0:
+                break
+    
+    if best is None:
+        return None
+    return _SBSCOOKER_ERROR_FORMATTERS[best.lastgroup](best)
+
+
+def _parse_form_tags(raw: str) -> Optional[list]:
+    """
+    Parse the JSON tag list sent with an upload form.
     
-    if "Cannot open the package" in error_msg:
-        return "Cannot open SBS package. The file may be corrupted or in an invalid format."
+    Returns None if the field is too large, is not valid JSON, or is not
+    a list of strings.
+    """
+    if len(raw) > _MAX_TAGS_FIELD:
+        return None
+    try:
+        tags = current_app.json.loads(raw)
+    except ValueError:
+        return None
+    if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+        return None
+    return tags
+
+
+def _asset_items_json(db, assets) -> list:
+    """
+    Serialize assets with their textures as JSON fragments.
     
-    # Return original message if no pattern matched
-    return error_msg
+    Textures are fetched in one batch, and the per-asset and per-texture
+    JSON is reused from the models' caches instead of being re-encoded.
+    """
+    textures_by_asset = db.get_textures_for_assets([asset.id for asset in assets])
+    items = []
+    for asset in assets:
+        textures = b','.join(t.to_json() for t in textures_by_asset.get(asset.id, ()))
+        # Splice the textures array into the cached asset object
+        items.append(asset.to_json()[:-1] + b',"textures":[' + textures + b']}')
+    return items
+
+
+def _asset_page_response(items: list, total: int, page: int, page_size: int):
+    """Build a paginated list response from pre-encoded item fragments."""
+    envelope = json.dumps({
+        'total': total,
+        'page': page,
+        'pageSize': page_size,
+        'totalPages': (total + page_size - 1) // page_size
+    }, separators=(',', ':')).encode('utf-8')
+    body = b'{"items":[' + b','.join(items) + b'],' + envelope[1:]
+    return current_app.response_class(body, mimetype='application/json')
+
+
+def _store_upload(stream, filename: str, asset, db, storage):
+    """
+    Store an uploaded source file for a new asset.
+    
+    The file is hashed while it is written. If another asset already has
+    the same content, the staged copy is discarded and the new asset shares
+    the existing file and its processing results.
+    
+    Returns:
+        The existing asset with identical content, or None.
+    """
+    temp_path, content_hash = storage.stage_upload(stream)
+    asset.content_hash = content_hash
+    
+    try:
+        duplicate = db.get_asset_by_content_hash(content_hash)
+        if duplicate is None or not Path(duplicate.storage_path).exists():
+            asset.storage_path, asset.source_file_url = storage.commit_upload(
+                temp_path, filename, asset.id
+            )
+            return None
+    except Exception:
+        # Don't leave the staged copy behind in .incoming
+        storage.discard_upload(temp_path)
+        raise
+    
+    storage.discard_upload(temp_path)
+    asset.storage_path = duplicate.storage_path
+    asset.source_file_url = duplicate.source_file_url
+    asset.thumbnail_url = duplicate.thumbnail_url
+    asset.metadata = dict(duplicate.metadata)
+    asset.has_parameters = duplicate.has_parameters
+    asset.has_thumbnail = duplicate.has_thumbnail
+    asset.has_baked_textures = duplicate.has_baked_textures
+    logger.info(f"Upload {filename} has the same content as asset {duplicate.id}")
+    return duplicate
 
 
 assets_bp = Blueprint('assets', __name__, url_prefix='/api/assets')
@@ -69,22 +207,10 @@ def list_assets():
         tags=tags if tags else None
     )
     
-    # Get textures for each asset
-    items = []
-    for asset in assets:
-        asset_dict = asset.to_dict()
-        textures = db.get_textures_for_asset(asset.id)
-        asset_dict['textures'] = [t.to_dict() for t in textures]
-        items.append(asset_dict)
+    items = _asset_items_json(db, assets)
     
     logger.info(f"Returning {len(items)} assets (total: {total})")
-    return jsonify({
-        'items': items,
-        'total': total,
-        'page': page,
-        'pageSize': page_size,
-        'totalPages': (total + page_size - 1) // page_size
-    })
+    return _asset_page_response(items, total, page, page_size)
 
 
 @assets_bp.route('/<asset_id>', methods=['GET'])
@@ -98,11 +224,9 @@ def get_asset(asset_id):
         logger.warning(f"Asset not found: {asset_id}")
         return jsonify({'error': 'Asset not found'}), 404
     
-    asset_dict = asset.to_dict()
-    textures = db.get_textures_for_asset(asset.id)
-    asset_dict['textures'] = [t.to_dict() for t in textures]
-    
-    return jsonify(asset_dict)
+    return current_app.response_class(
+        _asset_items_json(db, [asset])[0], mimetype='application/json'
+    )
 
 
 @assets_bp.route('/upload', methods=['POST'])
@@ -111,8 +235,9 @@ def upload_asset():
     Upload an SBS/SBSAR source file.
     
     This is the main entry point for adding new Substance files to the repository.
-    The file is stored and an asset record is created. Thumbnails and texture
-    baking can be done later.
+    The file is stored and an asset record is created. Parameter extraction
+    and thumbnail generation are queued in the background; poll
+    ``/<asset_id>/process-status`` for their results.
     """
     logger.info("Uploading new asset")
     
@@ -127,15 +252,17 @@ def upload_asset():
     
     # Validate file type
     filename = file.filename
-    if not filename.lower().endswith(('.sbs', '.sbsar')):
+    file_type = _source_file_type(filename)
+    if file_type is None:
         logger.error(f"Invalid file type: {filename}")
         return jsonify({'error': 'Only SBS and SBSAR files are allowed'}), 400
     
-    file_type = 'sbs' if filename.lower().endswith('.sbs') else 'sbsar'
-    
     name = request.form.get('name', Path(filename).stem)
     description = request.form.get('description', f'Substance {file_type.upper()} file')
-    tags = json.loads(request.form.get('tags', '[]'))
+    tags = _parse_form_tags(request.form.get('tags', '[]'))
+    if tags is None:
+        logger.error("Invalid tags in upload request")
+        return jsonify({'error': 'Tags must be a JSON list of strings'}), 400
     
     db = current_app.config['database']
     storage = current_app.config['storage']
@@ -151,19 +278,13 @@ def upload_asset():
         tags=tags + [file_type, 'uploaded']
     )
     
-    # Save source file to storage
-    file_data = file.read()
-    storage_path, source_url = storage.save_uploaded_file(
-        file_data,
-        filename,
-        asset.id
-    )
-    
-    asset.storage_path = storage_path
-    asset.source_file_url = source_url
+    # Save source file to storage (or reuse identical content)
+    duplicate = _store_upload(file.stream, filename, asset, db, storage)
+    storage_path = asset.storage_path
     
-    # Generate placeholder thumbnail URL
-    asset.thumbnail_url = f"https://via.placeholder.com/128/6366f1/ffffff?text={file_type.upper()}"
+    if duplicate is None:
+        # Generate placeholder thumbnail URL
+        asset.thumbnail_url = f"https://via.placeholder.com/128/6366f1/ffffff?text={file_type.upper()}"
     
     # Save to database
     db.save_asset(asset)
@@ -171,11 +292,12 @@ def upload_asset():
     logger.info(f"Asset uploaded successfully: {asset.id} ({filename})")
     logger.info(f"Storage path: {storage_path}")
     
-    # Auto-process: Extract parameters and generate thumbnail
-    auto_process_results = _auto_process_asset(asset, db, storage)
-    
-    # Reload asset to get updated data
-    asset = db.get_asset(asset.id)
+    # Auto-process: Extract parameters and generate thumbnail. A duplicate
+    # reuses the original's results, unless those are still being produced
+    if duplicate is None or _auto_process_pending(duplicate.id):
+        auto_process_status = _queue_auto_process(asset, db, storage)
+    else:
+        auto_process_status = {'status': 'skipped', 'duplicateOf': duplicate.id}
     
     return jsonify({
         'id': asset.id,
@@ -189,13 +311,48 @@ def upload_asset():
         'hasParameters': asset.has_parameters,
         'hasThumbnail': asset.has_thumbnail,
         'hasBakedTextures': asset.has_baked_textures,
-        'autoProcess': auto_process_results
-    }), 201
+        'autoProcess': auto_process_status
+    }), 202
+
+
+def _auto_process_pending(asset_id: str) -> bool:
+    """Whether an asset's auto-processing is queued or still running."""
+    status = current_app.config['auto_process_status'].get(asset_id)
+    return status is not None and status['status'] in ('queued', 'running')
+
+
+def _queue_auto_process(asset, db, storage) -> dict:
+    """Queue auto-processing of an asset on the background pool."""
+    status = current_app.config['auto_process_status']
+    queued = {'status': 'queued'}
+    status.set(asset.id, queued)
+    current_app.config['auto_process_pool'].submit(
+        _auto_process_worker, asset.id, db, storage, status
+    )
+    return queued
+
+
+def _auto_process_worker(asset_id, db, storage, status):
+    """Background entry point for _auto_process_asset."""
+    asset = db.get_asset(asset_id)
+    if asset is None:
+        status.delete(asset_id)
+        return
+    # Work on a copy; request threads keep serializing the cached asset
+    asset = replace(asset, tags=list(asset.tags), metadata=dict(asset.metadata or {}))
+    
+    status.set(asset_id, {'status': 'running'})
+    try:
+        results = _auto_process_asset(asset, db, storage)
+    except Exception as e:
+        logger.exception(f"Auto-processing failed for asset: {asset_id}")
+        status.set(asset_id, {'status': 'failed', 'error': str(e)})
+    else:
+        status.set(asset_id, {'status': 'done', 'results': results})
 
 
 def _auto_process_asset(asset, db, storage):
     """Auto-process asset: extract parameters and generate thumbnail."""
-    from datetime import datetime
     results = {
         'parameters': {'success': False, 'error': None},
         'thumbnail': {'success': False, 'error': None}
@@ -203,10 +360,9 @@ def _auto_process_asset(asset, db, storage):
     
     # 1. Extract parameters
     try:
-        from extractor.extractor import ParameterExtractor
         logger.info(f"Auto-extracting parameters for asset: {asset.id}")
         
-        extractor = ParameterExtractor()
+        extractor = get_extractor()
         param_result = extractor.extract(asset.storage_path)
         
         if param_result.get('success', False):
@@ -225,10 +381,9 @@ def _auto_process_asset(asset, db, storage):
     
     # 2. Generate thumbnail
     try:
-        from thumbnail.renderer import ThumbnailRenderer
         logger.info(f"Auto-generating thumbnail for asset: {asset.id}")
         
-        renderer = ThumbnailRenderer()
+        renderer = get_renderer()
         render_result = renderer.render(
             filepath=asset.storage_path,
             resolution=512,
@@ -241,7 +396,8 @@ def _auto_process_asset(asset, db, storage):
             thumb_storage_path, thumb_url = storage.save_file(
                 render_result.output_path,
                 f"{asset.id}_thumbnail.png",
-                asset.id
+                asset.id,
+                move=True
             )
             
             asset.thumbnail_url = thumb_url
@@ -256,13 +412,57 @@ def _auto_process_asset(asset, db, storage):
         results['thumbnail']['error'] = str(e)
         logger.warning(f"Thumbnail generation failed: {e}")
     
-    # Save updated asset
-    asset.updated_at = datetime.utcnow()
-    db.save_asset(asset)
+    # Save updated asset, unless it was deleted while processing
+    asset.updated_at = datetime.now(timezone.utc)
+    if not db.save_asset_if_present(asset):
+        logger.info(f"Asset {asset.id} was deleted while processing; results dropped")
     
     return results
 
 
+# Upper bound on threads used to store one batch upload
+_BATCH_UPLOAD_WORKERS = 8
+
+
+def _save_batch_file(file, db, storage) -> tuple:
+    """Validate and store one file of a batch upload; returns (result, asset)."""
+    from ..models import Asset
+    
+    filename = file.filename
+    file_type = _source_file_type(filename)
+    if file_type is None:
+        return {
+            'filename': filename,
+            'error': 'Only SBS and SBSAR files are allowed'
+        }, None
+    
+    # Create asset
+    asset = Asset.create(
+        name=Path(filename).stem,
+        source_file=filename,
+        file_type=file_type,
+        description=f'Substance {file_type.upper()} file',
+        tags=[file_type, 'uploaded', 'batch']
+    )
+    
+    # Save source file (or reuse identical content)
+    duplicate = _store_upload(file.stream, filename, asset, db, storage)
+    if duplicate is None:
+        asset.thumbnail_url = f"https://via.placeholder.com/128/6366f1/ffffff?text={file_type.upper()}"
+    
+    logger.info(f"Batch upload: {asset.id} ({filename})")
+    
+    result = {
+        'id': asset.id,
+        'filename': filename,
+        'sourceFileUrl': asset.source_file_url,
+        'success': True
+    }
+    if duplicate is not None:
+        result['duplicateOf'] = duplicate.id
+    return result, asset
+
+
 @assets_bp.route('/upload-batch', methods=['POST'])
 def upload_batch():
     """Upload multiple SBS/SBSAR files."""
@@ -278,54 +478,25 @@ def upload_batch():
     db = current_app.config['database']
     storage = current_app.config['storage']
     
-    from ..models import Asset
+    files = [file for file in files if file.filename != '']
     
+    # Storage writes are I/O bound, so overlap them; map() keeps file order
     results = []
-    for file in files:
-        if file.filename == '':
-            continue
-        
-        filename = file.filename
-        if not filename.lower().endswith(('.sbs', '.sbsar')):
-            results.append({
-                'filename': filename,
-                'error': 'Only SBS and SBSAR files are allowed'
-            })
-            continue
-        
-        file_type = 'sbs' if filename.lower().endswith('.sbs') else 'sbsar'
-        
-        # Create asset
-        asset = Asset.create(
-            name=Path(filename).stem,
-            source_file=filename,
-            file_type=file_type,
-            description=f'Substance {file_type.upper()} file',
-            tags=[file_type, 'uploaded', 'batch']
-        )
-        
-        # Save source file
-        file_data = file.read()
-        storage_path, source_url = storage.save_uploaded_file(
-            file_data,
-            filename,
-            asset.id
-        )
-        
-        asset.storage_path = storage_path
-        asset.source_file_url = source_url
-        asset.thumbnail_url = f"https://via.placeholder.com/128/6366f1/ffffff?text={file_type.upper()}"
-        
-        db.save_asset(asset)
-        
-        logger.info(f"Batch upload: {asset.id} ({filename})")
-        
-        results.append({
-            'id': asset.id,
-            'filename': filename,
-            'sourceFileUrl': source_url,
-            'success': True
-        })
+    new_assets = []
+    if files:
+        with ThreadPoolExecutor(max_workers=min(_BATCH_UPLOAD_WORKERS, len(files))) as pool:
+            for result, asset in pool.map(lambda f: _save_batch_file(f, db, storage), files):
+                results.append(result)
+                if asset is not None:
+                    new_assets.append(asset)
+    
+    db.save_assets(new_assets)
+    
+    # Duplicates of assets still being processed need their own run
+    for result in results:
+        duplicate_id = result.get('duplicateOf')
+        if duplicate_id is not None and _auto_process_pending(duplicate_id):
+            result['autoProcess'] = _queue_auto_process(db.get_asset(result['id']), db, storage)
     
     return jsonify({
         'uploaded': len([r for r in results if r.get('success')]),
@@ -361,8 +532,7 @@ def update_asset(asset_id):
     if 'hasBakedTextures' in data:
         asset.has_baked_textures = data['hasBakedTextures']
     
-    from datetime import datetime
-    asset.updated_at = datetime.utcnow()
+    asset.updated_at = datetime.now(timezone.utc)
     
     db.save_asset(asset)
     
@@ -380,8 +550,12 @@ def delete_asset(asset_id):
     if not asset:
         return jsonify({'error': 'Asset not found'}), 404
     
-    # Delete source file
-    if asset.storage_path:
+    # Delete source file, unless another asset shares it
+    shared = asset.content_hash and any(
+        other.id != asset.id and other.storage_path == asset.storage_path
+        for other in db.get_assets_by_content_hash(asset.content_hash)
+    )
+    if asset.storage_path and not shared:
         storage.delete_file(asset.storage_path)
         logger.info(f"Deleted source file: {asset.storage_path}")
     
@@ -392,11 +566,23 @@ def delete_asset(asset_id):
     
     # Delete from database
     db.delete_asset(asset_id)
+    current_app.config['auto_process_status'].delete(asset_id)
     
     logger.info(f"Asset deleted: {asset_id}")
     return jsonify({'success': True})
 
 
+@assets_bp.route('/<asset_id>/process-status', methods=['GET'])
+def get_process_status(asset_id):
+    """Get the status of an asset's background auto-processing."""
+    db = current_app.config['database']
+    if not db.get_asset(asset_id):
+        return jsonify({'error': 'Asset not found'}), 404
+    
+    status = current_app.config['auto_process_status'].get(asset_id, {'status': 'idle'})
+    return jsonify(status)
+
+
 @assets_bp.route('/search', methods=['GET'])
 def search_assets():
     """Search assets."""
@@ -413,20 +599,9 @@ def search_assets():
         tags=tags if tags else None
     )
     
-    items = []
-    for asset in assets:
-        asset_dict = asset.to_dict()
-        textures = db.get_textures_for_asset(asset.id)
-        asset_dict['textures'] = [t.to_dict() for t in textures]
-        items.append(asset_dict)
+    items = _asset_items_json(db, assets)
     
-    return jsonify({
-        'items': items,
-        'total': total,
-        'page': page,
-        'pageSize': page_size,
-        'totalPages': (total + page_size - 1) // page_size
-    })
+    return _asset_page_response(items, total, page, page_size)
 
 
 @assets_bp.route('/<asset_id>/generate-thumbnail', methods=['POST'])
@@ -455,12 +630,9 @@ def generate_asset_thumbnail(asset_id):
     use_material_ball = data.get('useMaterialBall', True)
     
     try:
-        # Import from the correct path
-        from thumbnail.renderer import ThumbnailRenderer
-        
         logger.info(f"Rendering thumbnail from: {asset.storage_path}")
         
-        renderer = ThumbnailRenderer()
+        renderer = get_renderer()
         result = renderer.render(
             filepath=asset.storage_path,
             resolution=resolution,
@@ -478,7 +650,8 @@ def generate_asset_thumbnail(asset_id):
         thumb_storage_path, thumb_url = storage.save_file(
             result.output_path,
             f"{asset.id}_thumbnail.png",
-            asset.id
+            asset.id,
+            move=True
         )
         
         logger.info(f"Thumbnail saved: {thumb_url}")
@@ -487,8 +660,7 @@ def generate_asset_thumbnail(asset_id):
         asset.thumbnail_url = thumb_url
         asset.has_thumbnail = True
         
-        from datetime import datetime
-        asset.updated_at = datetime.utcnow()
+        asset.updated_at = datetime.now(timezone.utc)
         
         db.save_asset(asset)
         
@@ -526,12 +698,9 @@ def extract_asset_parameters(asset_id):
         return jsonify({'error': f'Source file not found: {asset.storage_path}'}), 404
     
     try:
-        # Import parameter extractor
-        from extractor.extractor import ParameterExtractor
-        
         logger.info(f"Extracting parameters from: {asset.storage_path}")
         
-        extractor = ParameterExtractor()
+        extractor = get_extractor()
         result = extractor.extract(asset.storage_path)
         
         if not result.get('success', False):
@@ -549,8 +718,7 @@ def extract_asset_parameters(asset_id):
             asset.metadata = {}
         asset.metadata['parameters'] = result.get('data', {})
         
-        from datetime import datetime
-        asset.updated_at = datetime.utcnow()
+        asset.updated_at = datetime.now(timezone.utc)
         
         db.save_asset(asset)
         
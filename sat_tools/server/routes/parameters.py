@@ -4,29 +4,93 @@ Parameters API Routes
 REST API endpoints for parameter file management.
 """
 
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app
 import json
 from pathlib import Path
 
+from extractor.schema import ParameterSchema
+
+from ..cache import LRUStore
+from ..services import get_extractor
+
 parameters_bp = Blueprint('parameters', __name__, url_prefix='/api/parameters')
 
 
-# In-memory storage for parameter files
-_parameter_files = {}
+class ParameterStore(LRUStore):
+    """
+    Parameter file store with a trigram index over the lowercased
+    filename and graph names, so search only verifies candidate files.
+    """
+    
+    def __init__(self, maxsize: int = 2048):
+        super().__init__(maxsize)
+        self._text: dict = {}
+        self._trigrams: dict = {}
+    
+    @staticmethod
+    def _search_text(filename: str, data: dict) -> str:
+        # Uploaded files are not schema-checked, so tolerate odd shapes
+        graphs = data.get('graphs') if isinstance(data, dict) else None
+        if not isinstance(graphs, list):
+            graphs = []
+        names = [str(graph.get('name') or '') for graph in graphs if isinstance(graph, dict)]
+        return '\n'.join([filename] + names).lower()
+    
+    def set(self, key: str, value: dict):
+        # Build the search text first, so a failure leaves the store unchanged
+        text = self._search_text(key, value)
+        with self._lock:
+            if key in self._data:
+                self._removed(key, self._data[key])
+            super().set(key, value)
+            self._text[key] = text
+            for i in range(len(text) - 2):
+                self._trigrams.setdefault(text[i:i + 3], set()).add(key)
+    
+    def _removed(self, key: str, value: dict):
+        text = self._text.pop(key, '')
+        for i in range(len(text) - 2):
+            keys = self._trigrams.get(text[i:i + 3])
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._trigrams[text[i:i + 3]]
+    
+    def search(self, query: str) -> list:
+        """Get parameter files whose filename or a graph name contains query."""
+        query = query.lower()
+        with self._lock:
+            if len(query) < 3:
+                candidates = self._text
+            else:
+                sets = [self._trigrams.get(query[i:i + 3], set()) for i in range(len(query) - 2)]
+                candidates = set.intersection(*sets)
+            matches = sorted(key for key in candidates if query in self._text[key])
+            return [self._data[key] for key in matches]
+
+
+# In-memory storage for parameter files (bounded, shared between threads)
+_parameter_files = ParameterStore(maxsize=2048)
+
+
+def _json_response(data, status: int = 200) -> Response:
+    """Build a JSON response using the parameter file codec."""
+    return Response(ParameterSchema.encode(data), status=status, mimetype='application/json')
 
 
 @parameters_bp.route('', methods=['GET'])
 def list_parameters():
     """Get list of all parameter files."""
-    files = list(_parameter_files.values())
-    return jsonify(files)
+    files = _parameter_files.values()
+    return _json_response(files)
 
 
 @parameters_bp.route('/<path:filename>', methods=['GET'])
 def get_parameter_file(filename):
     """Get a parameter file by filename."""
-    if filename in _parameter_files:
-        return jsonify(_parameter_files[filename])
+    data = _parameter_files.get(filename)
+    if data is not None:
+        return _json_response(data)
     return jsonify({'error': 'Parameter file not found'}), 404
 
 
@@ -43,15 +107,17 @@ def extract_parameters():
         return jsonify({'error': f'File not found: {filepath}'}), 404
     
     try:
-        from ...extractor import ParameterExtractor
-        
-        extractor = ParameterExtractor()
+        extractor = get_extractor()
         result = extractor.extract(filepath)
         
+        if not result.get('success', False):
+            return jsonify({'error': result.get('error', 'Unknown error')}), 500
+        
         # Store in memory
-        _parameter_files[result.filename] = result.to_dict()
+        data = result['data']
+        _parameter_files.set(data['filename'], data)
         
-        return jsonify(result.to_dict())
+        return _json_response(data)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -62,28 +128,17 @@ def search_parameters():
     query = request.args.get('query', '').lower()
     
     if not query:
-        return jsonify(list(_parameter_files.values()))
+        return _json_response(_parameter_files.values())
     
-    results = []
-    for filename, data in _parameter_files.items():
-        if query in filename.lower():
-            results.append(data)
-            continue
-        
-        # Search in graphs
-        for graph in data.get('graphs', []):
-            if query in graph.get('name', '').lower():
-                results.append(data)
-                break
+    results = _parameter_files.search(query)
     
-    return jsonify(results)
+    return _json_response(results)
 
 
 @parameters_bp.route('/<path:filename>', methods=['DELETE'])
 def delete_parameter_file(filename):
     """Delete a parameter file."""
-    if filename in _parameter_files:
-        del _parameter_files[filename]
+    if _parameter_files.delete(filename) is not None:
         return jsonify({'success': True})
     return jsonify({'error': 'Parameter file not found'}), 404
 
@@ -101,11 +156,15 @@ def upload_parameter_file():
     try:
         content = file.read().decode('utf-8')
         data = json.loads(content)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Parameter file must be a JSON object'}), 400
         
-        filename = data.get('filename', file.filename)
-        _parameter_files[filename] = data
+        filename = data.get('filename')
+        if not isinstance(filename, str) or not filename:
+            filename = file.filename
+        _parameter_files.set(filename, data)
         
-        return jsonify(data)
+        return _json_response(data)
     except json.JSONDecodeError as e:
         return jsonify({'error': f'Invalid JSON: {e}'}), 400
     except Exception as e:
@@ -5,37 +5,72 @@ REST API endpoints for thumbnail management.
 """
 
 from flask import Blueprint, request, jsonify, send_file, current_app
+import hashlib
 import json
+import os
+import shutil
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
+
+from ..cache import LRUStore
+from ..services import get_renderer
 
 thumbnails_bp = Blueprint('thumbnails', __name__, url_prefix='/api/thumbnails')
 
 
-# In-memory storage for thumbnails
-_thumbnails = {}
+# In-memory storage for thumbnails (bounded, shared between threads)
+_thumbnails = LRUStore(maxsize=2048)
 
 
 @thumbnails_bp.route('', methods=['GET'])
 def list_thumbnails():
     """Get list of all thumbnails."""
-    thumbnails = list(_thumbnails.values())
+    thumbnails = _thumbnails.values()
     return jsonify(thumbnails)
 
 
 @thumbnails_bp.route('/<thumbnail_id>', methods=['GET'])
 def get_thumbnail(thumbnail_id):
     """Get a thumbnail by ID."""
-    if thumbnail_id in _thumbnails:
-        return jsonify(_thumbnails[thumbnail_id])
+    thumbnail = _thumbnails.get(thumbnail_id)
+    if thumbnail is not None:
+        return jsonify(thumbnail)
     return jsonify({'error': 'Thumbnail not found'}), 404
 
 
+@thumbnails_bp.route('/<thumbnail_id>/image', methods=['GET'])
+def get_thumbnail_image(thumbnail_id):
+    """Serve the thumbnail image, answering conditional requests with 304."""
+    thumbnail = _thumbnails.get(thumbnail_id)
+    if thumbnail is None:
+        return jsonify({'error': 'Thumbnail not found'}), 404
+    
+    filepath = thumbnail.get('filepath', '')
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return jsonify({'error': 'Thumbnail file not found'}), 404
+    
+    # Fingerprint the file by identity, mtime and size instead of its contents
+    etag = hashlib.sha1(
+        f"{thumbnail_id}:{stat.st_mtime_ns}:{stat.st_size}".encode()
+    ).hexdigest()
+    
+    return send_file(
+        filepath,
+        conditional=True,
+        etag=etag,
+        last_modified=stat.st_mtime,
+        max_age=86400
+    )
+
+
 @thumbnails_bp.route('/<thumbnail_id>/metadata', methods=['GET'])
 def get_thumbnail_metadata(thumbnail_id):
     """Get thumbnail metadata."""
-    if thumbnail_id in _thumbnails:
-        return jsonify(_thumbnails[thumbnail_id].get('metadata', {}))
+    thumbnail = _thumbnails.get(thumbnail_id)
+    if thumbnail is not None:
+        return jsonify(thumbnail.get('metadata', {}))
     return jsonify({'error': 'Thumbnail not found'}), 404
 
 
@@ -55,9 +90,9 @@ def generate_thumbnail():
         return jsonify({'error': f'File not found: {filepath}'}), 404
     
     try:
-        from ...thumbnail import ThumbnailRenderer, ThumbnailMetadata, MetadataWriter
+        from thumbnail.metadata import ThumbnailMetadata, MetadataWriter
         
-        renderer = ThumbnailRenderer()
+        renderer = get_renderer()
         result = renderer.render(
             filepath=filepath,
             resolution=resolution,
@@ -84,7 +119,8 @@ def generate_thumbnail():
         thumbnail_id = str(uuid.uuid4())
         
         storage = current_app.config['storage']
-        storage_path, url = storage.save_file(result.output_path)
+        # The render output is a temp file; move it rather than copy it
+        storage_path, url = storage.save_file(result.output_path, move=True)
         
         thumbnail_data = {
             'id': thumbnail_id,
@@ -92,9 +128,9 @@ def generate_thumbnail():
             'filepath': storage_path,
             'url': url,
             'metadata': metadata.to_dict(),
-            'createdAt': datetime.utcnow().isoformat()
+            'createdAt': datetime.now(timezone.utc).isoformat()
         }
-        _thumbnails[thumbnail_id] = thumbnail_data
+        _thumbnails.set(thumbnail_id, thumbnail_data)
         
         return jsonify(thumbnail_data)
     except Exception as e:
@@ -116,62 +152,72 @@ def batch_generate():
     if not Path(directory).exists():
         return jsonify({'error': f'Directory not found: {directory}'}), 404
     
+    import tempfile
+    output_dir = None
     try:
-        from ...thumbnail import BatchProcessor
+        from thumbnail.batch import BatchProcessor
         
         processor = BatchProcessor()
         
         # Create temp output directory
-        import tempfile
         output_dir = tempfile.mkdtemp(prefix='sat_batch_')
         
-        result = processor.process_directory(
-            directory=directory,
+        # Renders run on the app-wide batch pool, so concurrent batch
+        # requests share BATCH_WORKERS sbsrender processes between them
+        result = processor.process_parallel(
+            files=[str(f) for f in processor.find_files(directory)],
             output_dir=output_dir,
             resolution=resolution,
             output_format=output_format,
-            use_material_ball=use_material_ball
+            use_material_ball=use_material_ball,
+            executor=current_app.config['batch_pool']
         )
         
         # Store thumbnails
         thumbnails = []
         storage = current_app.config['storage']
         
-        for item in result.results:
-            if item.get('success') and item.get('output'):
-                import uuid
-                thumbnail_id = str(uuid.uuid4())
-                
-                storage_path, url = storage.save_file(item['output'])
-                
-                thumbnail_data = {
-                    'id': thumbnail_id,
-                    'filename': Path(item['output']).name,
-                    'filepath': storage_path,
-                    'url': url,
-                    'metadata': {
-                        'sourceFile': item.get('file', ''),
-                        'generatedAt': datetime.utcnow().isoformat()
-                    },
-                    'createdAt': datetime.utcnow().isoformat()
-                }
-                _thumbnails[thumbnail_id] = thumbnail_data
-                thumbnails.append(thumbnail_data)
+        rendered = [item for item in result.results if item.get('success') and item.get('output')]
+        saved = storage.save_files_batch(
+            [(item['output'], None, None) for item in rendered],
+            move=True
+        )
+        
+        import uuid
+        for item, (storage_path, url) in zip(rendered, saved):
+            thumbnail_id = str(uuid.uuid4())
+            
+            thumbnail_data = {
+                'id': thumbnail_id,
+                'filename': Path(item['output']).name,
+                'filepath': storage_path,
+                'url': url,
+                'metadata': {
+                    'sourceFile': item.get('file', ''),
+                    'generatedAt': datetime.now(timezone.utc).isoformat()
+                },
+                'createdAt': datetime.now(timezone.utc).isoformat()
+            }
+            _thumbnails.set(thumbnail_id, thumbnail_data)
+            thumbnails.append(thumbnail_data)
         
         return jsonify(thumbnails)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+    finally:
+        if output_dir is not None:
+            shutil.rmtree(output_dir, ignore_errors=True)
 
 
 @thumbnails_bp.route('/<thumbnail_id>/metadata', methods=['POST'])
 def update_metadata(thumbnail_id):
     """Update thumbnail metadata."""
-    if thumbnail_id not in _thumbnails:
+    thumbnail = _thumbnails.get(thumbnail_id)
+    if thumbnail is None:
         return jsonify({'error': 'Thumbnail not found'}), 404
     
     data = request.get_json()
     
-    thumbnail = _thumbnails[thumbnail_id]
     if 'metadata' not in thumbnail:
         thumbnail['metadata'] = {}
     
@@ -183,15 +229,12 @@ def update_metadata(thumbnail_id):
 @thumbnails_bp.route('/<thumbnail_id>', methods=['DELETE'])
 def delete_thumbnail(thumbnail_id):
     """Delete a thumbnail."""
-    if thumbnail_id not in _thumbnails:
+    thumbnail = _thumbnails.delete(thumbnail_id)
+    if thumbnail is None:
         return jsonify({'error': 'Thumbnail not found'}), 404
     
-    thumbnail = _thumbnails[thumbnail_id]
-    
     # Delete file
     storage = current_app.config['storage']
     storage.delete_file(thumbnail.get('filepath', ''))
     
-    del _thumbnails[thumbnail_id]
-    
     return jsonify({'success': True})
@@ -0,0 +1,21 @@
+"""
+Shared Services
+
+Process-wide SAT tool wrappers used by the API routes.
+"""
+
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1)
+def get_extractor():
+    """Get the shared ParameterExtractor, created on first use."""
+    from extractor.extractor import ParameterExtractor
+    return ParameterExtractor()
+
+
+@lru_cache(maxsize=1)
+def get_renderer():
+    """Get the shared ThumbnailRenderer, created on first use."""
+    from thumbnail.renderer import ThumbnailRenderer
+    return ThumbnailRenderer()
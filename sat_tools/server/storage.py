@@ -4,12 +4,162 @@ Storage Service
 Provides file storage functionality for uploaded assets.
 """
 
+import hashlib
+import io
 import os
-import uuid
+import re
 import shutil
+import sys
+import tempfile
+import threading
+import time
 from pathlib import Path
-from typing import Optional, Tuple
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, List, Optional, Sequence, Tuple, Union
+
+from .cache import LRUStore
+
+# Splits a relative path on either separator
+_PATH_SEP_RE = re.compile(r'[\\/]')
+
+# Chunk size for copying upload streams to disk
+_COPY_BUFSIZE = 1 << 20
+
+# Concurrent copies in save_files_batch
+_BATCH_COPY_WORKERS = 8
+
+# Directories remembered as existing before the cache is reset
+_DIR_CACHE_SIZE = 1024
+
+# URLs remembered as missing by get_file_path, and for how many seconds
+_MISSING_URL_CACHE_SIZE = 4096
+_MISSING_URL_TTL = 5.0
+
+
+# UTC day number and its "YYYY/MM/DD" directory, reformatted once a day
+_date_cache = [-1, ""]
+
+
+def _today_path() -> str:
+    """Get today's (UTC) date directory, e.g. '2024/01/31'."""
+    t = time.time()
+    day = int(t // 86400)
+    if day != _date_cache[0]:
+        _date_cache[1] = time.strftime("%Y/%m/%d", time.gmtime(t))
+        _date_cache[0] = day
+    return _date_cache[1]
+
+
+def _file_sha256(path: Path) -> str:
+    """Hex SHA-256 of a file's content."""
+    with open(path, 'rb') as f:
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: f.read(_COPY_BUFSIZE), b''):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+
+# Random bytes handed out 4 at a time for anonymous file ids
+_RANDOM_POOL_SIZE = 4096
+_random_pool = b''
+_random_pos = 0
+_random_lock = threading.Lock()
+
+
+def _random_file_id() -> str:
+    """Get 8 random hex characters, reading os.urandom once per 1024 ids."""
+    global _random_pool, _random_pos
+    with _random_lock:
+        if _random_pos + 4 > len(_random_pool):
+            _random_pool = os.urandom(_RANDOM_POOL_SIZE)
+            _random_pos = 0
+        chunk = _random_pool[_random_pos:_random_pos + 4]
+        _random_pos += 4
+    return chunk.hex()
+
+
+def _reset_random_pool():
+    # A forked child must not hand out the same ids as its parent
+    global _random_pool, _random_pos, _random_lock
+    _random_pool = b''
+    _random_pos = 0
+    _random_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_random_pool)
+
+
+def _copy_stream(source: BinaryIO, dest: BinaryIO):
+    """
+    Copy a binary stream into an open destination file.
+    
+    Regular files are copied in the kernel with os.sendfile where
+    available; anything else is copied in fixed-size chunks.
+    """
+    if hasattr(os, 'sendfile') and isinstance(source, (io.FileIO, io.BufferedReader)):
+        try:
+            offset = source.tell()
+            size = os.fstat(source.fileno()).st_size
+            dest.flush()
+            while offset < size:
+                sent = os.sendfile(dest.fileno(), source.fileno(), offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+            source.seek(offset)
+            return
+        except OSError:
+            # Resume the chunked copy where sendfile stopped
+            source.seek(offset)
+    shutil.copyfileobj(source, dest, _COPY_BUFSIZE)
+
+
+def _copy_file(source: Path, dest: Path):
+    """
+    Copy a file's content and metadata, like shutil.copy2.
+    
+    On Linux the data is copied in the kernel: os.copy_file_range first
+    (which shares extents on reflink filesystems such as Btrfs and XFS),
+    then os.sendfile, with a 1 MB read/write loop as the last resort.
+    Elsewhere shutil.copyfile is used, which already picks the platform's
+    fast copy (fcopyfile on macOS).
+    """
+    if not sys.platform.startswith('linux'):
+        shutil.copyfile(source, dest)
+        shutil.copystat(source, dest)
+        return
+    
+    with open(source, 'rb', buffering=0) as fsrc, open(dest, 'wb', buffering=0) as fdst:
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(fsrc.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        try:
+            while os.copy_file_range(fsrc.fileno(), fdst.fileno(), 1 << 30):
+                pass
+        except OSError:
+            # Carries on from the current offsets with sendfile or a loop
+            _copy_stream(fsrc, fdst)
+    shutil.copystat(source, dest)
+
+
+def _prune_empty_dirs(path: str, keep: bool = False) -> bool:
+    """
+    Remove empty directories under path (and path itself unless keep),
+    in a single os.scandir pass. Returns True if path ended up empty.
+    """
+    empty = True
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if not entry.is_dir(follow_symlinks=False) or not _prune_empty_dirs(entry.path):
+                empty = False
+    if empty and not keep:
+        try:
+            os.rmdir(path)
+        except OSError:
+            return False
+    return empty
 
 
 class StorageService:
@@ -20,7 +170,8 @@ class StorageService:
     def __init__(
         self,
         base_path: str = "./storage",
-        url_prefix: str = "/static/assets"
+        url_prefix: str = "/static/assets",
+        allow_hardlinks: bool = False
     ):
         """
         Initialize the storage service.
@@ -28,13 +179,58 @@ class StorageService:
         Args:
             base_path: Base directory for file storage.
             url_prefix: URL prefix for accessing files.
+            allow_hardlinks: Let ``save_file`` hardlink sources on the same
+                filesystem instead of copying them. The stored file then
+                shares its inode (content changes, mtime) with the source.
         """
         # Always use absolute path for storage
         self.base_path = Path(base_path).resolve()
         self.url_prefix = url_prefix.rstrip('/')
+        self.allow_hardlinks = allow_hardlinks
         
         # Ensure base path exists
         self.base_path.mkdir(parents=True, exist_ok=True)
+        self._base_dev = os.stat(self.base_path).st_dev
+        
+        # Directories known to exist, so repeated saves skip mkdir
+        self._dir_cache: set = {str(self.base_path)}
+        
+        # URLs that get_file_path found no file for -> expiry (monotonic time)
+        self._missing_urls = LRUStore(maxsize=_MISSING_URL_CACHE_SIZE)
+    
+    def _ensure_dir(self, path: Path):
+        """Create a directory (and its parents) unless it is known to exist."""
+        key = str(path)
+        if key in self._dir_cache:
+            return
+        path.mkdir(parents=True, exist_ok=True)
+        if len(self._dir_cache) >= _DIR_CACHE_SIZE:
+            self.invalidate_dir_cache()
+        # Record the directory and every ancestor up to the base path
+        while key not in self._dir_cache and path.is_relative_to(self.base_path):
+            self._dir_cache.add(key)
+            path = path.parent
+            key = str(path)
+    
+    def invalidate_dir_cache(self):
+        """Forget which directories exist (after removing directories)."""
+        self._dir_cache = {str(self.base_path)}
+    
+    def _write_in_dir(self, directory: Path, write, *args, **kwargs):
+        """
+        Call write(*args, **kwargs) to create a file in directory.
+        
+        A cached directory can be removed by a concurrent ``delete_file``
+        pruning it while still empty; in that case it is recreated and the
+        write retried once.
+        """
+        try:
+            return write(*args, **kwargs)
+        except FileNotFoundError:
+            if directory.exists():
+                raise  # Something else is missing, such as the source
+            directory.mkdir(parents=True, exist_ok=True)
+            return write(*args, **kwargs)
     
     def _generate_path(self, filename: str, asset_id: Optional[str] = None) -> Tuple[Path, str]:
         """
@@ -48,26 +244,56 @@ class StorageService:
             Tuple of (storage_path, url).
         """
         # Generate date-based directory structure
-        now = datetime.utcnow()
-        date_path = now.strftime("%Y/%m/%d")
+        date_path = _today_path()
         
         # Generate unique filename
-        file_id = asset_id or str(uuid.uuid4())[:8]
+        file_id = asset_id or _random_file_id()
         ext = Path(filename).suffix
         unique_name = f"{file_id}_{filename}"
         
-        # Build paths (always use absolute path)
-        rel_path = Path(date_path) / unique_name
-        storage_path = (self.base_path / rel_path).resolve()
-        url = f"{self.url_prefix}/{rel_path.as_posix()}"
+        # Build paths (base_path is already absolute and resolved, and both
+        # parts are already posix strings)
+        rel_path = f"{date_path}/{unique_name}"
+        self._validate_rel(rel_path)
+        storage_path = self.base_path / rel_path
+        url = f"{self.url_prefix}/{rel_path}"
+        
+        # A file is about to be written here
+        self._missing_urls.delete(url)
+        
+        return storage_path, url
+    
+    def _content_path(self, digest: str, ext: str) -> Tuple[Path, str]:
+        """
+        Get the content-addressed storage path for a SHA-256 digest.
         
+        Args:
+            digest: Hex SHA-256 of the file content.
+            ext: File extension, including the dot.
+            
+        Returns:
+            Tuple of (storage_path, url).
+        """
+        rel_path = Path(digest[:2]) / digest[2:6] / f"{digest}{ext.lower()}"
+        storage_path = self.base_path / rel_path
+        url = f"{self.url_prefix}/{rel_path.as_posix()}"
+        self._missing_urls.delete(url)
         return storage_path, url
     
+    @staticmethod
+    def _validate_rel(rel_path: str):
+        """Reject relative paths that could point outside the storage root."""
+        if (os.path.isabs(rel_path) or os.path.splitdrive(rel_path)[0]
+                or '..' in _PATH_SEP_RE.split(rel_path)):
+            raise ValueError(f"Invalid storage path: {rel_path}")
+    
     def save_file(
         self,
         source_path: str,
         filename: Optional[str] = None,
-        asset_id: Optional[str] = None
+        asset_id: Optional[str] = None,
+        move: bool = False,
+        deduplicate: bool = False
     ) -> Tuple[str, str]:
         """
         Save a file to storage.
@@ -76,6 +302,13 @@ class StorageService:
             source_path: Path to source file.
             filename: Optional filename override.
             asset_id: Optional asset ID for grouping.
+            move: Move the source instead of copying it. On the same
+                filesystem this is a rename, with no second write pass.
+            deduplicate: Store the file under its SHA-256 digest instead
+                (``<ab>/<cdef>/<digest><ext>``), skipping the write when
+                identical content is already stored. Such files may be
+                shared between callers, so they should not be deleted
+                while still referenced.
             
         Returns:
             Tuple of (storage_path, url).
@@ -85,19 +318,78 @@ class StorageService:
             raise FileNotFoundError(f"Source file not found: {source_path}")
         
         filename = filename or source.name
-        storage_path, url = self._generate_path(filename, asset_id)
+        if deduplicate:
+            storage_path, url = self._content_path(_file_sha256(source), Path(filename).suffix)
+            if storage_path.exists():
+                if move:
+                    source.unlink()
+                return str(storage_path), url
+        else:
+            storage_path, url = self._generate_path(filename, asset_id)
         
         # Ensure directory exists
-        storage_path.parent.mkdir(parents=True, exist_ok=True)
+        self._ensure_dir(storage_path.parent)
         
-        # Copy file
-        shutil.copy2(source, storage_path)
+        self._write_in_dir(storage_path.parent, self._place_file, source, storage_path, move)
         
         return str(storage_path), url
     
+    def _place_file(self, source: Path, storage_path: Path, move: bool):
+        """Move, hardlink or copy a source file to its storage path."""
+        if move:
+            shutil.move(str(source), str(storage_path))
+            return
+        if self.allow_hardlinks and os.stat(source).st_dev == self._base_dev:
+            try:
+                os.link(source, storage_path)
+                return
+            except OSError:
+                pass
+        _copy_file(source, storage_path)
+    
+    def save_files_batch(
+        self,
+        files: Sequence[Tuple[str, Optional[str], Optional[str]]],
+        move: bool = False
+    ) -> List[Tuple[str, str]]:
+        """
+        Save several files to storage at once.
+        
+        Destination directories are created once for the whole batch and
+        the copies run concurrently, so the kernel-side copies overlap.
+        
+        Args:
+            files: (source_path, filename, asset_id) tuples; filename and
+                asset_id may be None, as for ``save_file``.
+            move: Move the sources instead of copying them.
+            
+        Returns:
+            List of (storage_path, url) tuples, in the order of ``files``.
+        """
+        sources = []
+        targets = []
+        for source_path, filename, asset_id in files:
+            source = Path(source_path)
+            if not source.exists():
+                raise FileNotFoundError(f"Source file not found: {source_path}")
+            sources.append(source)
+            targets.append(self._generate_path(filename or source.name, asset_id))
+        
+        # Ensure directories exist
+        for parent in {storage_path.parent for storage_path, _ in targets}:
+            self._ensure_dir(parent)
+        
+        with ThreadPoolExecutor(max_workers=_BATCH_COPY_WORKERS) as pool:
+            list(pool.map(
+                lambda source, path: self._write_in_dir(path.parent, self._place_file, source, path, move),
+                sources, [path for path, _ in targets]
+            ))
+        
+        return [(str(storage_path), url) for storage_path, url in targets]
+    
     def save_uploaded_file(
         self,
-        file_data: bytes,
+        file_data: Union[bytes, BinaryIO],
         filename: str,
         asset_id: Optional[str] = None
     ) -> Tuple[str, str]:
@@ -105,24 +397,119 @@ class StorageService:
         Save uploaded file data to storage.
         
         Args:
-            file_data: File content as bytes.
+            file_data: File content as bytes, or a binary stream (passed
+                on to ``save_uploaded_stream``).
             filename: Filename.
             asset_id: Optional asset ID.
             
         Returns:
             Tuple of (storage_path, url).
         """
+        if not isinstance(file_data, (bytes, bytearray, memoryview)):
+            return self.save_uploaded_stream(file_data, filename, asset_id)
+        
         storage_path, url = self._generate_path(filename, asset_id)
         
         # Ensure directory exists
-        storage_path.parent.mkdir(parents=True, exist_ok=True)
+        self._ensure_dir(storage_path.parent)
         
         # Write file
-        with open(storage_path, 'wb') as f:
+        with self._write_in_dir(storage_path.parent, open, storage_path, 'wb') as f:
             f.write(file_data)
         
         return str(storage_path), url
     
+    def save_uploaded_stream(
+        self,
+        stream: BinaryIO,
+        filename: str,
+        asset_id: Optional[str] = None
+    ) -> Tuple[str, str]:
+        """
+        Save an upload stream to storage without reading it into memory.
+        
+        Args:
+            stream: Binary stream, such as an upload's ``stream``. It is
+                copied in 1 MB chunks (or with sendfile for real files).
+            filename: Filename.
+            asset_id: Optional asset ID.
+            
+        Returns:
+            Tuple of (storage_path, url).
+        """
+        storage_path, url = self._generate_path(filename, asset_id)
+        
+        # Ensure directory exists
+        self._ensure_dir(storage_path.parent)
+        
+        # Unbuffered, since the copy already writes in large chunks
+        with self._write_in_dir(storage_path.parent, open, storage_path, 'wb', buffering=0) as f:
+            _copy_stream(stream, f)
+        
+        return str(storage_path), url
+    
+    def stage_upload(self, file_data: Union[bytes, BinaryIO]) -> Tuple[str, str]:
+        """
+        Write upload data to a temporary file, hashing it on the way.
+        
+        The staged file must be passed to ``commit_upload`` or
+        ``discard_upload``.
+        
+        Args:
+            file_data: File content as bytes or a binary stream.
+            
+        Returns:
+            Tuple of (temp_path, sha256 hex digest).
+        """
+        incoming = self.base_path / '.incoming'
+        self._ensure_dir(incoming)
+        
+        digest = hashlib.sha256()
+        with tempfile.NamedTemporaryFile(dir=incoming, delete=False) as f:
+            try:
+                if isinstance(file_data, (bytes, bytearray, memoryview)):
+                    digest.update(file_data)
+                    f.write(file_data)
+                else:
+                    for chunk in iter(lambda: file_data.read(_COPY_BUFSIZE), b''):
+                        digest.update(chunk)
+                        f.write(chunk)
+            except BaseException:
+                f.close()
+                os.unlink(f.name)
+                raise
+        
+        return f.name, digest.hexdigest()
+    
+    def commit_upload(
+        self,
+        temp_path: str,
+        filename: str,
+        asset_id: Optional[str] = None
+    ) -> Tuple[str, str]:
+        """
+        Move a staged upload to its final storage location.
+        
+        Args:
+            temp_path: Path returned by ``stage_upload``.
+            filename: Filename.
+            asset_id: Optional asset ID.
+            
+        Returns:
+            Tuple of (storage_path, url).
+        """
+        storage_path, url = self._generate_path(filename, asset_id)
+        self._ensure_dir(storage_path.parent)
+        self._write_in_dir(storage_path.parent, os.replace, temp_path, storage_path)
+        return str(storage_path), url
+    
+    def discard_upload(self, temp_path: str):
+        """Delete a staged upload that is not needed."""
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
+    
     def delete_file(self, storage_path: str) -> bool:
         """
         Delete a file from storage.
@@ -136,9 +523,27 @@ class StorageService:
         path = Path(storage_path)
         if path.exists():
             path.unlink()
+            self._prune_parents(path)
             return True
         return False
     
+    def _prune_parents(self, path: Path):
+        """
+        Remove the now-empty directories above a deleted file, up to the
+        base path. Today's directory is kept, since new saves go there.
+        """
+        today = self.base_path / _today_path()
+        parent = path.parent
+        while parent != self.base_path and parent.is_relative_to(self.base_path):
+            if parent == today:
+                break
+            try:
+                parent.rmdir()
+            except OSError:
+                break
+            self._dir_cache.discard(str(parent))
+            parent = parent.parent
+    
     def get_file_path(self, url: str) -> Optional[str]:
         """
         Get the storage path for a URL.
@@ -152,18 +557,25 @@ class StorageService:
         if not url.startswith(self.url_prefix):
             return None
         
+        # URLs recently found missing are answered without a stat
+        expires = self._missing_urls.get(url)
+        if expires is not None and expires > time.monotonic():
+            return None
+        
         rel_path = url[len(self.url_prefix):].lstrip('/')
         storage_path = self.base_path / rel_path
         
         if storage_path.exists():
             return str(storage_path)
+        self._missing_urls.set(url, time.monotonic() + _MISSING_URL_TTL)
         return None
     
     def cleanup_empty_dirs(self):
-        """Remove empty directories in storage."""
-        for dirpath, dirnames, filenames in os.walk(self.base_path, topdown=False):
-            if not dirnames and not filenames:
-                try:
-                    os.rmdir(dirpath)
-                except OSError:
-                    pass
+        """
+        Remove empty directories in storage.
+        
+        This walks the whole tree, so it is a maintenance task;
+        ``delete_file`` already removes directories it leaves empty.
+        """
+        _prune_empty_dirs(str(self.base_path), keep=True)
+        self.invalidate_dir_cache()
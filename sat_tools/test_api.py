@@ -174,6 +174,7 @@ def test_database():
         
         # Cleanup
         db.delete_asset(asset.id)
+        db.close()
         db_path.unlink()
         print("[OK] Cleanup successful")
         return True
@@ -184,6 +185,74 @@ def test_database():
         return False
 
 
+def test_duplicate_upload():
+    """Test that a duplicate uploaded while the original is processing gets processed."""
+    print("\n" + "=" * 60)
+    print("Testing duplicate upload during auto-processing...")
+    print("=" * 60)
+    
+    import io
+    import tempfile
+    import threading
+    from server.app import create_app
+    from server.routes import assets as assets_routes
+    
+    release = threading.Event()
+    
+    class SlowExtractor:
+        def extract(self, filepath):
+            release.wait(10)
+            return {'success': True, 'data': {'graphs': []}}
+    
+    class FailingRenderer:
+        def render(self, **kwargs):
+            from thumbnail.renderer import RenderResult
+            return RenderResult(success=False, error='sbsrender not found.')
+    
+    get_extractor, get_renderer = assets_routes.get_extractor, assets_routes.get_renderer
+    assets_routes.get_extractor = SlowExtractor
+    assets_routes.get_renderer = FailingRenderer
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            app = create_app({
+                'DATABASE_PATH': os.path.join(temp_dir, 'assets.db'),
+                'STORAGE_PATH': os.path.join(temp_dir, 'storage')
+            })
+            client = app.test_client()
+            
+            ids = []
+            for _ in range(2):
+                response = client.post(
+                    '/api/assets/upload',
+                    data={'file': (io.BytesIO(b'same content'), 'material.sbs')},
+                    content_type='multipart/form-data'
+                )
+                ids.append(response.get_json()['id'])
+            release.set()
+            app.config['auto_process_pool'].shutdown(wait=True)
+            
+            for asset_id in ids:
+                asset = client.get(f'/api/assets/{asset_id}').get_json()
+                status = client.get(f'/api/assets/{asset_id}/process-status').get_json()
+                if not asset['hasParameters'] or status['status'] != 'done':
+                    print(f"[FAIL] Asset {asset_id}: hasParameters={asset['hasParameters']}, "
+                          f"status={status['status']}")
+                    return False
+            
+            app.config['database'].close()
+        print("[OK] Both uploads were processed")
+        return True
+    except Exception as e:
+        print(f"[FAIL] Duplicate upload test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    finally:
+        release.set()
+        assets_routes.get_extractor = get_extractor
+        assets_routes.get_renderer = get_renderer
+
+
 def test_full_workflow(sbs_file: str):
     """Test the complete workflow."""
     print("\n" + "=" * 60)
@@ -300,7 +369,10 @@ def main():
     # Test 3: Database
     results.append(("Database", test_database()))
     
-    # Test 4: Render thumbnail (only if sbsrender is available)
+    # Test 4: Duplicate uploads while auto-processing
+    results.append(("Duplicate upload", test_duplicate_upload()))
+    
+    # Test 5: Render thumbnail (only if sbsrender is available)
     if results[0][1]:  # sbsrender is available
         results.append(("Render thumbnail", test_render_thumbnail(str(sbs_file))))
         results.append(("Get outputs", test_get_outputs(str(sbs_file))))
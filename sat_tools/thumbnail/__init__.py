@@ -5,9 +5,17 @@ This module provides functionality to generate thumbnails from Substance
 Designer files and embed metadata into the generated images.
 """
 
-from .renderer import ThumbnailRenderer
-from .metadata import ThumbnailMetadata, MetadataWriter, MetadataReader
-from .batch import BatchProcessor
+import importlib
+
+# Public names and the submodule defining each; imported on first access
+# (PEP 562) so the CLI does not load every submodule just to start
+_EXPORTS = {
+    'ThumbnailRenderer': '.renderer',
+    'ThumbnailMetadata': '.metadata',
+    'MetadataWriter': '.metadata',
+    'MetadataReader': '.metadata',
+    'BatchProcessor': '.batch',
+}
 
 __all__ = [
     'ThumbnailRenderer',
@@ -17,3 +25,12 @@ __all__ = [
     'BatchProcessor'
 ]
 __version__ = '1.0.0'
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -10,16 +10,21 @@ Usage:
     python -m sat_tools.thumbnail.cli read-metadata <image>
 """
 
-import argparse
+import os
 import sys
-import json
 from pathlib import Path
 
 
+def _parse_tags(raw):
+    """Split a --tags value once into a tuple shared by every file's metadata."""
+    if not raw:
+        return ()
+    return tuple(tag for tag in map(str.strip, raw.split(',')) if tag)
+
+
 def cmd_generate(args):
     """Generate a thumbnail for a single file."""
-    from .renderer import ThumbnailRenderer
-    from .metadata import ThumbnailMetadata, MetadataWriter
+    from . import ThumbnailRenderer
     
     filepath = args.file
     output = args.output
@@ -43,11 +48,13 @@ def cmd_generate(args):
             
             # Embed metadata
             if not args.no_metadata:
+                from . import ThumbnailMetadata, MetadataWriter
+                
                 metadata = ThumbnailMetadata.create(
                     source_file=filepath,
                     graph_name=result.graph_name,
                     resolution=result.resolution,
-                    tags=args.tags.split(',') if args.tags else []
+                    tags=_parse_tags(args.tags)
                 )
                 writer = MetadataWriter()
                 writer.write(result.output_path, metadata)
@@ -65,7 +72,7 @@ def cmd_generate(args):
 
 def cmd_batch(args):
     """Batch generate thumbnails."""
-    from .batch import BatchProcessor
+    from . import BatchProcessor
     
     directory = args.directory
     output_dir = args.output or directory
@@ -75,9 +82,15 @@ def cmd_batch(args):
     print(f"Batch processing: {directory}")
     print(f"Output directory: {output_dir}")
     print(f"Recursive: {recursive}")
+    if args.no_metadata:
+        print("Metadata: disabled (source files will not be hashed)")
     
     try:
-        processor = BatchProcessor(args.sat_path)
+        processor = BatchProcessor(
+            args.sat_path,
+            max_workers=args.workers or os.cpu_count() or 4,
+            use_processes=args.processes
+        )
         
         def progress(current, total, filename):
             print(f"  [{current}/{total}] {filename}")
@@ -89,7 +102,7 @@ def cmd_batch(args):
             recursive=recursive,
             use_material_ball=not args.flat,
             embed_metadata=not args.no_metadata,
-            tags=args.tags.split(',') if args.tags else None,
+            tags=_parse_tags(args.tags),
             progress_callback=progress
         )
         
@@ -112,17 +125,18 @@ def cmd_batch(args):
 
 def cmd_read_metadata(args):
     """Read metadata from a thumbnail image."""
-    from .metadata import MetadataReader
+    from . import MetadataReader
     
     image_path = args.image
     
     try:
         reader = MetadataReader()
-        metadata = reader.read(image_path)
+        # Print the stored JSON as-is rather than parsing and re-encoding it
+        metadata_json = reader.read_raw(image_path)
         
-        if metadata:
+        if metadata_json:
             print("Metadata found:")
-            print(json.dumps(metadata.to_dict(), indent=2))
+            print(metadata_json)
         else:
             print("No SAT metadata found in image.")
         
@@ -133,57 +147,170 @@ def cmd_read_metadata(args):
         return 1
 
 
-def main():
-    """Main entry point."""
+def _positive_int(value):
+    """Argument type for a count of at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        import argparse
+        raise argparse.ArgumentTypeError(f"must be a whole number of at least 1, got {value!r}")
+    return number
+
+
+# Option kinds: FLAG is a store_true switch, any callable converts a value
+FLAG = None
+
+# Top-level options, given before the command: (flags, dest, kind, default, help)
+_GLOBAL_OPTIONS = (
+    (('--sat-path',), 'sat_path', str, None, 'Path to SAT installation'),
+    (('--no-hash-cache',), 'no_hash_cache', FLAG, False,
+     'Re-hash source files instead of using the on-disk hash cache'),
+)
+
+# Subcommands: name -> (help, positional (dest, help), options)
+_COMMANDS = {
+    'generate': ('Generate thumbnail for a file', ('file', 'Path to SBS/SBSAR file'), (
+        (('-o', '--output'), 'output', str, None, 'Output path'),
+        (('-r', '--resolution'), 'resolution', int, 512, 'Output resolution (default: 512)'),
+        (('--flat',), 'flat', FLAG, False, 'Use flat rendering instead of material ball'),
+        (('--no-metadata',), 'no_metadata', FLAG, False, 'Do not embed metadata'),
+        (('--tags',), 'tags', str, None, 'Comma-separated tags'),
+    )),
+    'batch': ('Batch generate thumbnails', ('directory', 'Directory with SBS/SBSAR files'), (
+        (('-o', '--output'), 'output', str, None, 'Output directory'),
+        (('-r', '--resolution'), 'resolution', int, 512, 'Output resolution (default: 512)'),
+        (('--flat',), 'flat', FLAG, False, 'Use flat rendering instead of material ball'),
+        (('--recursive',), 'recursive', FLAG, False, 'Search recursively'),
+        (('--no-metadata',), 'no_metadata', FLAG, False, 'Do not embed metadata'),
+        (('--tags',), 'tags', str, None, 'Comma-separated tags'),
+        (('-j', '--workers'), 'workers', _positive_int, None,
+         'Files processed at once (default: CPU count; 1 for in order)'),
+        (('--processes',), 'processes', FLAG, False, 'Use worker processes instead of threads'),
+    )),
+    'read-metadata': ('Read metadata from image', ('image', 'Path to PNG image'), ()),
+}
+
+
+def _parse_options(argv, options, namespace):
+    """
+    Parse argv against an option table into namespace, stopping at the
+    first positional argument.
+    
+    Returns:
+        Index of the first unconsumed argument, or None if argv needs
+        argparse (help, unknown options, bad values, ``--opt=value``).
+    """
+    by_flag = {flag: option for option in options for flag in option[0]}
+    i = 0
+    while i < len(argv) and argv[i].startswith('-'):
+        option = by_flag.get(argv[i])
+        if option is None:
+            return None
+        _, dest, kind, _, _ = option
+        if kind is FLAG:
+            setattr(namespace, dest, True)
+            i += 1
+            continue
+        if i + 1 >= len(argv) or argv[i + 1].startswith('-'):
+            return None
+        try:
+            setattr(namespace, dest, kind(argv[i + 1]))
+        except Exception:
+            return None
+        i += 2
+    return i
+
+
+def _fast_parse(argv):
+    """
+    Parse a well-formed command line without importing argparse.
+    
+    Returns:
+        The parsed arguments, or None to defer to argparse.
+    """
+    from types import SimpleNamespace
+    
+    args = SimpleNamespace(command=None)
+    for _, dest, _, default, _ in _GLOBAL_OPTIONS:
+        setattr(args, dest, default)
+    
+    i = _parse_options(argv, _GLOBAL_OPTIONS, args)
+    if i is None or i >= len(argv) or argv[i] not in _COMMANDS:
+        return None
+    
+    args.command = argv[i]
+    _, (positional, _), options = _COMMANDS[args.command]
+    for _, dest, _, default, _ in options:
+        setattr(args, dest, default)
+    
+    # Options may come before or after the single positional argument
+    rest = argv[i + 1:]
+    i = _parse_options(rest, options, args)
+    if i is None or i >= len(rest):
+        return None
+    setattr(args, positional, rest[i])
+    rest = rest[i + 1:]
+    if _parse_options(rest, options, args) != len(rest):
+        return None
+    return args
+
+
+def _build_parser():
+    """Build the full argparse parser, used for help and error reporting."""
+    import argparse
+    
     parser = argparse.ArgumentParser(
         prog='sat-thumbnail',
         description='SAT Thumbnail Generator'
     )
-    parser.add_argument('--sat-path', help='Path to SAT installation')
     
+    def add_options(target, options):
+        for flags, dest, kind, default, help_text in options:
+            if kind is FLAG:
+                target.add_argument(*flags, dest=dest, action='store_true', help=help_text)
+            else:
+                target.add_argument(*flags, dest=dest, type=kind, default=default, help=help_text)
+    
+    add_options(parser, _GLOBAL_OPTIONS)
     subparsers = parser.add_subparsers(dest='command', help='Commands')
+    for name, (help_text, (positional, positional_help), options) in _COMMANDS.items():
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument(positional, help=positional_help)
+        add_options(sub, options)
+    return parser
+
+
+def main():
+    """Main entry point."""
+    argv = sys.argv[1:]
+    
+    # Answer --version without building the parser
+    if argv[:1] == ['--version']:
+        from . import __version__
+        print(f"sat-thumbnail {__version__}")
+        return 0
+    
+    # Well-formed command lines skip argparse; help and errors still use it
+    args = _fast_parse(argv)
+    if args is None:
+        parser = _build_parser()
+        args = parser.parse_args(argv)
+        if args.command is None:
+            parser.print_help()
+            return 0
     
-    # Generate command
-    gen_parser = subparsers.add_parser('generate', help='Generate thumbnail for a file')
-    gen_parser.add_argument('file', help='Path to SBS/SBSAR file')
-    gen_parser.add_argument('-o', '--output', help='Output path')
-    gen_parser.add_argument('-r', '--resolution', type=int, default=512,
-                           help='Output resolution (default: 512)')
-    gen_parser.add_argument('--flat', action='store_true',
-                           help='Use flat rendering instead of material ball')
-    gen_parser.add_argument('--no-metadata', action='store_true',
-                           help='Do not embed metadata')
-    gen_parser.add_argument('--tags', help='Comma-separated tags')
-    
-    # Batch command
-    batch_parser = subparsers.add_parser('batch', help='Batch generate thumbnails')
-    batch_parser.add_argument('directory', help='Directory with SBS/SBSAR files')
-    batch_parser.add_argument('-o', '--output', help='Output directory')
-    batch_parser.add_argument('-r', '--resolution', type=int, default=512,
-                             help='Output resolution (default: 512)')
-    batch_parser.add_argument('--flat', action='store_true',
-                             help='Use flat rendering instead of material ball')
-    batch_parser.add_argument('--recursive', action='store_true',
-                             help='Search recursively')
-    batch_parser.add_argument('--no-metadata', action='store_true',
-                             help='Do not embed metadata')
-    batch_parser.add_argument('--tags', help='Comma-separated tags')
-    
-    # Read metadata command
-    read_parser = subparsers.add_parser('read-metadata', help='Read metadata from image')
-    read_parser.add_argument('image', help='Path to PNG image')
-    
-    args = parser.parse_args()
+    if args.no_hash_cache:
+        from .metadata import set_hash_cache_enabled
+        set_hash_cache_enabled(False)
     
     if args.command == 'generate':
         return cmd_generate(args)
     elif args.command == 'batch':
         return cmd_batch(args)
-    elif args.command == 'read-metadata':
-        return cmd_read_metadata(args)
     else:
-        parser.print_help()
-        return 0
+        return cmd_read_metadata(args)
 
 
 if __name__ == '__main__':
@@ -7,21 +7,330 @@ using PNG text chunks.
 
 import json
 import hashlib
+import mmap
+import os
+import shutil
+import sqlite3
+import struct
+import tempfile
+import threading
+import zlib
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, List, Dict, Any
-from dataclasses import dataclass, field, asdict
+from typing import Optional, Dict, Any, BinaryIO, Iterator, Tuple, Union
+from dataclasses import dataclass
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the json module
+    orjson = None
 
-@dataclass
-class ThumbnailMetadata:
-    """Metadata embedded in a thumbnail image."""
+try:
+    from isal import isal_zlib as _crc_backend  # ISA-L's SIMD CRC32, when installed
+except ImportError:
+    _crc_backend = zlib
+
+
+def _dumps(data: Any) -> str:
+    """Serialize to compact JSON, keeping non-ASCII characters as-is."""
+    if orjson is not None:
+        return orjson.dumps(data).decode('utf-8')
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# PNG chunk types that carry keyword/text pairs
+_TEXT_CHUNK_TYPES = (b'tEXt', b'zTXt', b'iTXt')
+
+
+def _png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    """Build a PNG chunk: length, type, data and CRC."""
+    return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', _crc_backend.crc32(data, _crc_backend.crc32(chunk_type)))
+
+
+def _png_text_chunk(key: str, value: Union[str, bytes]) -> bytes:
+    """
+    Build a tEXt chunk, or an uncompressed iTXt chunk if value is not Latin-1.
+    
+    A bytes value is taken as UTF-8 and written without re-encoding: as tEXt
+    when it is plain ASCII, otherwise as iTXt.
+    """
+    keyword = key.encode('latin-1')
+    if isinstance(value, bytes):
+        chunk_type = b'tEXt' if value.isascii() else b'iTXt'
+        header = b'\0' if chunk_type == b'tEXt' else b'\0\0\0\0\0'
+        return _png_chunk(chunk_type, keyword + header + value)
+    try:
+        return _png_chunk(b'tEXt', keyword + b'\0' + value.encode('latin-1'))
+    except UnicodeEncodeError:
+        return _png_chunk(b'iTXt', keyword + b'\0\0\0\0\0' + value.encode('utf-8'))
+
+
+def _iter_png_chunks(f: BinaryIO) -> Iterator[Tuple[int, int, bytes]]:
+    """
+    Yield (offset, data length, type) for each chunk of an open PNG file,
+    seeking over chunk data instead of reading it.
+    """
+    if f.read(len(PNG_SIGNATURE)) != PNG_SIGNATURE:
+        raise ValueError("Not a PNG image")
+    offset = len(PNG_SIGNATURE)
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            raise ValueError("Truncated PNG image")
+        length, chunk_type = struct.unpack('>I4s', header)
+        yield offset, length, chunk_type
+        if chunk_type == b'IEND':
+            return
+        offset += 12 + length
+        f.seek(offset)
+
+
+def _decode_text_chunk(chunk_type: bytes, data: bytes) -> Tuple[str, str]:
+    """Decode a tEXt, zTXt or iTXt chunk's data into (keyword, text)."""
+    keyword, _, rest = data.partition(b'\0')
+    if chunk_type == b'tEXt':
+        text = rest.decode('latin-1')
+    elif chunk_type == b'zTXt':
+        text = zlib.decompress(rest[1:]).decode('latin-1')
+    else:
+        compressed = rest[0]
+        _, _, rest = rest[2:].partition(b'\0')  # language tag
+        _, _, rest = rest.partition(b'\0')  # translated keyword
+        text = (zlib.decompress(rest) if compressed else rest).decode('utf-8')
+    return keyword.decode('latin-1'), text
+
+
+def read_png_text(image_path: str, keywords: Optional[Tuple[str, ...]] = None) -> Dict[str, str]:
+    """
+    Read the text chunks of a PNG file without decoding its pixels.
+    
+    Unlike Pillow's ``info``, this also sees text chunks after the image
+    data, where ``inject_png_text`` may append them.
+    
+    Args:
+        image_path: Path to the PNG image.
+        keywords: Optional keywords to look for. Other text chunks are
+            skipped without being decoded, and the scan stops once every
+            keyword has been found.
+        
+    Returns:
+        Keyword to text mapping.
+    """
+    wanted = None if keywords is None else {key.encode('latin-1') for key in keywords}
+    texts = {}
+    with open(image_path, 'rb') as f:
+        for offset, length, chunk_type in _iter_png_chunks(f):
+            if chunk_type not in _TEXT_CHUNK_TYPES:
+                continue
+            f.seek(offset + 8)
+            data = f.read(length)
+            if wanted is not None:
+                keyword = data.split(b'\0', 1)[0]
+                if keyword not in wanted:
+                    continue
+                wanted.discard(keyword)
+            keyword, text = _decode_text_chunk(chunk_type, data)
+            texts[keyword] = text
+            if wanted is not None and not wanted:
+                break
+    return texts
+
+
+def inject_png_text(image_path: str, texts: Dict[str, Union[str, bytes]]):
+    """
+    Add text chunks to a PNG file without decoding its pixels.
+    
+    When the file has no text chunks for these keywords yet, the new
+    chunks are written over the IEND chunk in place (and IEND re-added
+    after them), touching only the end of the file. Otherwise the old
+    chunks are dropped, the new ones placed before the first IDAT chunk,
+    and the file replaced atomically.
+    
+    Args:
+        image_path: Path to the PNG image.
+        texts: Keyword to text mapping; bytes values are UTF-8 text.
+    """
+    keywords = {key.encode('latin-1') for key in texts}
+    new_chunks = b''.join(_png_text_chunk(key, value) for key, value in texts.items())
+    
+    with open(image_path, 'r+b') as f:
+        try:
+            for offset, length, chunk_type in _iter_png_chunks(f):
+                if chunk_type in _TEXT_CHUNK_TYPES:
+                    f.seek(offset + 8)
+                    if f.read(min(length, 80)).split(b'\0', 1)[0] in keywords:
+                        break
+            else:
+                f.seek(offset)
+                f.write(new_chunks + _png_chunk(b'IEND', b''))
+                f.truncate()
+                return
+        except ValueError as e:
+            raise ValueError(f"{e}: {image_path}")
+    
+    _rewrite_png_text(image_path, keywords, new_chunks)
+
+
+def _rewrite_png_text(image_path: str, keywords: set, new_chunks: bytes):
+    """Rewrite a PNG with new_chunks before IDAT, dropping text chunks for keywords."""
+    with open(image_path, 'rb') as f:
+        data = f.read()
+    
+    parts = [PNG_SIGNATURE]
+    pos = len(PNG_SIGNATURE)
+    inserted = False
+    while pos + 8 <= len(data):
+        length, chunk_type = struct.unpack_from('>I4s', data, pos)
+        end = pos + 12 + length
+        if end > len(data):
+            raise ValueError(f"Truncated PNG chunk in {image_path}")
+        if chunk_type == b'IDAT' and not inserted:
+            parts.append(new_chunks)
+            inserted = True
+        if not (chunk_type in _TEXT_CHUNK_TYPES and data[pos + 8:end - 4].split(b'\0', 1)[0] in keywords):
+            parts.append(data[pos:end])
+        pos = end
+    if not inserted:
+        raise ValueError(f"No image data in {image_path}")
+    
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(image_path)), suffix='.png')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.writelines(parts)
+        os.chmod(temp_path, os.stat(image_path).st_mode & 0o7777)
+        os.replace(temp_path, image_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def _source_hash(source_file: str) -> str:
+    """
+    12-hex-character BLAKE2b digest of a file.
+    
+    The file is memory-mapped so the digest reads straight from the page
+    cache; files that cannot be mapped (empty files, some network or
+    special files) are read in chunks instead.
+    """
+    with open(source_file, 'rb') as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mm, 'madvise'):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                return hashlib.blake2b(mm, digest_size=6).hexdigest()
+        except (ValueError, OSError):
+            f.seek(0)
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, lambda: hashlib.blake2b(digest_size=6)).hexdigest()
+        digest = hashlib.blake2b(digest_size=6)
+        while chunk := f.read(1 << 16):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+
+class _HashCache:
+    """
+    On-disk cache of source hashes keyed by (path, mtime, size), so an
+    unchanged file is not re-read on every batch run.
+    
+    Any SQLite error (read-only home directory, locked database) falls
+    back to hashing the file directly.
+    """
+    
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self.enabled = True
+        self._local = threading.local()
+    
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite connections are per thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=5)
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS hashes ('
+                'path TEXT PRIMARY KEY, mtime INTEGER, size INTEGER, digest TEXT)'
+            )
+            self._local.conn = conn
+        return conn
+    
+    def digest(self, source_file: str) -> str:
+        """Get the source hash of a file, from the cache when it is unchanged."""
+        if not self.enabled:
+            return _source_hash(source_file)
+        
+        path = os.path.abspath(source_file)
+        stat = os.stat(path)
+        try:
+            conn = self._connection()
+            row = conn.execute(
+                'SELECT mtime, size, digest FROM hashes WHERE path = ?', (path,)
+            ).fetchone()
+            if row is not None and row[0] == stat.st_mtime_ns and row[1] == stat.st_size:
+                return row[2]
+        except (sqlite3.Error, OSError):
+            return _source_hash(source_file)
+        
+        digest = _source_hash(source_file)
+        try:
+            with conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO hashes (path, mtime, size, digest) VALUES (?, ?, ?, ?)',
+                    (path, stat.st_mtime_ns, stat.st_size, digest)
+                )
+        except sqlite3.Error:
+            pass
+        return digest
+
+
+_hash_cache = _HashCache(
+    Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'sat_thumbnail' / 'hash.db'
+)
+
+
+def set_hash_cache_enabled(enabled: bool):
+    """Turn the on-disk source hash cache used by ThumbnailMetadata.create on or off."""
+    _hash_cache.enabled = enabled
+
+
+@lru_cache(maxsize=1)
+def _pil():
+    """
+    Import Pillow on first use, returning (Image, PngImagePlugin).
+    
+    Only needed to convert non-PNG images; pillow-simd works as a faster
+    drop-in replacement for that re-encode.
+    """
+    try:
+        from PIL import Image, PngImagePlugin
+    except ImportError:
+        raise ImportError("Pillow is required. Install with: pip install Pillow")
+    return Image, PngImagePlugin
+
+
+class _JsonCacheSlot:
+    """Holds the serialized-JSON slot outside the dataclass fields."""
+    __slots__ = ('_json_cache',)
+
+
+@dataclass(frozen=True, slots=True)
+class ThumbnailMetadata(_JsonCacheSlot):
+    """Metadata embedded in a thumbnail image.
+    
+    Fields cannot be reassigned, so the serialized JSON is cached on first
+    use. The resolution and custom_data dicts are not frozen; treat them as
+    read-only once the metadata has been serialized.
+    """
     source_file: str
     graph_name: str
     generated_at: str
     resolution: Dict[str, int]
     parameter_hash: str = ""
-    tags: List[str] = field(default_factory=list)
+    tags: Tuple[str, ...] = ()
     custom_data: Optional[Dict[str, Any]] = None
     
     def to_dict(self) -> Dict[str, Any]:
@@ -39,8 +348,35 @@ class ThumbnailMetadata:
         return data
     
     def to_json(self) -> str:
-        """Convert to JSON string."""
-        return json.dumps(self.to_dict(), ensure_ascii=False)
+        """Convert to compact JSON string."""
+        return self.to_json_bytes().decode('utf-8')
+    
+    def to_json_bytes(self) -> bytes:
+        """Convert to compact UTF-8 encoded JSON (cached on first use)."""
+        try:
+            return self._json_cache
+        except AttributeError:
+            pass
+        if orjson is not None:
+            data = orjson.dumps(self.to_dict())
+        else:
+            data = self._render_json().encode('utf-8')
+        object.__setattr__(self, '_json_cache', data)
+        return data
+    
+    def _render_json(self) -> str:
+        """Fill the fixed key layout directly, skipping the intermediate dict."""
+        text = (
+            f'{{"sourceFile":{_dumps(self.source_file)},'
+            f'"graphName":{_dumps(self.graph_name)},'
+            f'"generatedAt":{_dumps(self.generated_at)},'
+            f'"resolution":{_dumps(self.resolution)},'
+            f'"parameterHash":{_dumps(self.parameter_hash)},'
+            f'"tags":{_dumps(self.tags)}'
+        )
+        if self.custom_data:
+            return f'{text},"customData":{_dumps(self.custom_data)}}}'
+        return text + '}'
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'ThumbnailMetadata':
@@ -51,7 +387,7 @@ class ThumbnailMetadata:
             generated_at=data.get('generatedAt', ''),
             resolution=data.get('resolution', {'width': 0, 'height': 0}),
             parameter_hash=data.get('parameterHash', ''),
-            tags=data.get('tags', []),
+            tags=tuple(data.get('tags', ())),
             custom_data=data.get('customData'),
         )
     
@@ -66,8 +402,9 @@ class ThumbnailMetadata:
         source_file: str,
         graph_name: str,
         resolution: tuple,
-        tags: Optional[List[str]] = None,
-        custom_data: Optional[Dict[str, Any]] = None
+        tags: Optional[Tuple[str, ...]] = None,
+        custom_data: Optional[Dict[str, Any]] = None,
+        generated_at: Optional[str] = None
     ) -> 'ThumbnailMetadata':
         """
         Create metadata for a new thumbnail.
@@ -76,8 +413,10 @@ class ThumbnailMetadata:
             source_file: Path to the source SBS/SBSAR file.
             graph_name: Name of the rendered graph.
             resolution: Tuple of (width, height).
-            tags: Optional list of tags.
+            tags: Optional tuple of tags; a tuple is shared, not copied.
             custom_data: Optional custom data dictionary.
+            generated_at: Optional ISO timestamp; batch runs pass one
+                shared timestamp instead of reading the clock per file.
             
         Returns:
             New ThumbnailMetadata instance.
@@ -85,18 +424,17 @@ class ThumbnailMetadata:
         # Generate parameter hash from source file
         param_hash = ""
         try:
-            with open(source_file, 'rb') as f:
-                param_hash = hashlib.md5(f.read()).hexdigest()[:12]
+            param_hash = _hash_cache.digest(source_file)
         except Exception:
-            param_hash = hashlib.md5(source_file.encode()).hexdigest()[:12]
+            param_hash = hashlib.blake2b(source_file.encode(), digest_size=6).hexdigest()
         
         return cls(
-            source_file=str(Path(source_file).name),
+            source_file=os.path.basename(source_file),
             graph_name=graph_name,
-            generated_at=datetime.now().isoformat(),
+            generated_at=generated_at or datetime.now().isoformat(),
             resolution={'width': resolution[0], 'height': resolution[1]},
             parameter_hash=param_hash,
-            tags=tags or [],
+            tags=tuple(tags) if tags else (),
             custom_data=custom_data,
         )
 
@@ -110,19 +448,13 @@ class MetadataWriter:
     
     METADATA_KEY = 'SAT_Metadata'
     
-    def __init__(self):
-        """Initialize the writer."""
-        self._has_pillow = False
-        try:
-            from PIL import Image, PngImagePlugin
-            self._has_pillow = True
-        except ImportError:
-            pass
-    
     def write(self, image_path: str, metadata: ThumbnailMetadata) -> bool:
         """
         Write metadata to a PNG image.
         
+        The text chunks are spliced into the existing file, so the image
+        is not decoded and re-encoded (and Pillow is not needed).
+        
         Args:
             image_path: Path to the PNG image.
             metadata: Metadata to embed.
@@ -130,11 +462,6 @@ class MetadataWriter:
         Returns:
             True if successful.
         """
-        if not self._has_pillow:
-            raise ImportError("Pillow is required for metadata writing. Install with: pip install Pillow")
-        
-        from PIL import Image, PngImagePlugin
-        
         path = Path(image_path)
         if not path.exists():
             raise FileNotFoundError(f"Image not found: {image_path}")
@@ -143,22 +470,7 @@ class MetadataWriter:
             raise ValueError("Only PNG images are supported for metadata embedding")
         
         try:
-            # Open the image
-            img = Image.open(image_path)
-            
-            # Create metadata
-            pnginfo = PngImagePlugin.PngInfo()
-            pnginfo.add_text(self.METADATA_KEY, metadata.to_json())
-            
-            # Also add individual fields as separate chunks for compatibility
-            pnginfo.add_text('SAT_SourceFile', metadata.source_file)
-            pnginfo.add_text('SAT_GraphName', metadata.graph_name)
-            pnginfo.add_text('SAT_GeneratedAt', metadata.generated_at)
-            pnginfo.add_text('SAT_Tags', ','.join(metadata.tags))
-            
-            # Save with metadata
-            img.save(image_path, 'PNG', pnginfo=pnginfo)
-            
+            inject_png_text(image_path, {self.METADATA_KEY: metadata.to_json_bytes()})
             return True
         except Exception as e:
             raise RuntimeError(f"Failed to write metadata: {e}")
@@ -180,23 +492,29 @@ class MetadataWriter:
         Returns:
             Path to the output image.
         """
-        if not self._has_pillow:
-            raise ImportError("Pillow is required. Install with: pip install Pillow")
+        # Ensure output is PNG
+        if not output_path.lower().endswith('.png'):
+            output_path = str(Path(output_path).with_suffix('.png'))
         
-        from PIL import Image, PngImagePlugin
+        with open(source_image, 'rb') as f:
+            is_png = f.read(len(PNG_SIGNATURE)) == PNG_SIGNATURE
+        
+        if is_png:
+            # Already PNG: copy the bytes and splice the chunk in rather
+            # than decoding and re-encoding every pixel
+            if not os.path.exists(output_path) or not os.path.samefile(source_image, output_path):
+                shutil.copyfile(source_image, output_path)
+            inject_png_text(output_path, {self.METADATA_KEY: metadata.to_json_bytes()})
+            return output_path
         
-        img = Image.open(source_image)
+        Image, PngImagePlugin = _pil()
         
         pnginfo = PngImagePlugin.PngInfo()
         pnginfo.add_text(self.METADATA_KEY, metadata.to_json())
-        pnginfo.add_text('SAT_SourceFile', metadata.source_file)
-        pnginfo.add_text('SAT_GraphName', metadata.graph_name)
         
-        # Ensure output is PNG
-        if not output_path.lower().endswith('.png'):
-            output_path = str(Path(output_path).with_suffix('.png'))
-        
-        img.save(output_path, 'PNG', pnginfo=pnginfo)
+        # Close the source as soon as it is saved rather than on collection
+        with Image.open(source_image) as img:
+            img.save(output_path, 'PNG', pnginfo=pnginfo)
         
         return output_path
 
@@ -208,15 +526,6 @@ class MetadataReader:
     
     METADATA_KEY = 'SAT_Metadata'
     
-    def __init__(self):
-        """Initialize the reader."""
-        self._has_pillow = False
-        try:
-            from PIL import Image
-            self._has_pillow = True
-        except ImportError:
-            pass
-    
     def read(self, image_path: str) -> Optional[ThumbnailMetadata]:
         """
         Read metadata from a PNG image.
@@ -227,38 +536,31 @@ class MetadataReader:
         Returns:
             ThumbnailMetadata if found, None otherwise.
         """
-        if not self._has_pillow:
-            raise ImportError("Pillow is required. Install with: pip install Pillow")
+        json_str = self.read_raw(image_path)
+        if json_str is None:
+            return None
         
-        from PIL import Image
+        try:
+            return ThumbnailMetadata.from_json(json_str)
+        except Exception as e:
+            raise RuntimeError(f"Failed to read metadata: {e}")
+    
+    def read_raw(self, image_path: str) -> Optional[str]:
+        """
+        Read the embedded metadata JSON without parsing it.
         
-        path = Path(image_path)
-        if not path.exists():
+        Args:
+            image_path: Path to the PNG image.
+            
+        Returns:
+            The metadata JSON string if found, None otherwise.
+        """
+        if not os.path.exists(image_path):
             raise FileNotFoundError(f"Image not found: {image_path}")
         
         try:
-            img = Image.open(image_path)
-            
-            # Try to read the main metadata chunk
-            if hasattr(img, 'info') and self.METADATA_KEY in img.info:
-                json_str = img.info[self.METADATA_KEY]
-                return ThumbnailMetadata.from_json(json_str)
-            
-            # Fallback: try to reconstruct from individual chunks
-            if hasattr(img, 'info'):
-                source_file = img.info.get('SAT_SourceFile', '')
-                graph_name = img.info.get('SAT_GraphName', '')
-                
-                if source_file or graph_name:
-                    return ThumbnailMetadata(
-                        source_file=source_file,
-                        graph_name=graph_name,
-                        generated_at=img.info.get('SAT_GeneratedAt', ''),
-                        resolution={'width': img.width, 'height': img.height},
-                        tags=img.info.get('SAT_Tags', '').split(',') if img.info.get('SAT_Tags') else [],
-                    )
-            
-            return None
+            # All metadata lives in the one JSON chunk
+            return read_png_text(image_path, (self.METADATA_KEY,)).get(self.METADATA_KEY)
         except Exception as e:
             raise RuntimeError(f"Failed to read metadata: {e}")
     
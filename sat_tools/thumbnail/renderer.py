@@ -5,18 +5,125 @@ Provides functionality to render thumbnails from SBS/SBSAR files
 using sbsrender command-line tool.
 """
 
+import atexit
+import hashlib
+import html
+import itertools
 import os
+import re
 import subprocess
 import tempfile
 import logging
-import math
 import shutil
+import threading
+import time
 from pathlib import Path
-from typing import Optional, List, Dict, Any, Tuple
-from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Any, Tuple, Iterable, Iterator
+from dataclasses import dataclass, field, replace
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 logger = logging.getLogger(__name__)
 
+# Graph, input and output lines of `sbsrender info`: keyword, then the rest
+_INFO_LINE_RE = re.compile(r'^[ \t]*(GRAPH-URL|INPUT|OUTPUT)\S*(.*)$', re.MULTILINE)
+
+# Lowercased output names/usages preferred for a thumbnail -> rank (lower is better)
+_PRIORITY_OUTPUTS = {'basecolor': 0, 'diffuse': 1, 'albedo': 2, 'base_color': 3}
+
+# Most `sbsrender info` outputs kept per renderer
+_INFO_CACHE_SIZE = 256
+
+# Cooked SBSARs, reused while their SBS source is unchanged
+_COOK_CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'sat_thumbnail' / 'cooked'
+_COOK_CACHE_MAX_BYTES = 1 << 30
+# Cooked SBSARs used this recently may be about to be read by sbsrender,
+# so the size sweep leaves them alone
+_COOK_CACHE_MIN_AGE = 300
+
+# Files an .sbs references: package dependencies (<filename>) and linked
+# resources such as bitmaps (<filepath>)
+_SBS_REF_RE = re.compile(rb'<(?:filename|filepath) v="([^"]*)"')
+
+
+def _run_tool(
+    cmd: List[str],
+    timeout: Optional[float] = None,
+    capture_stdout: bool = False
+) -> subprocess.CompletedProcess:
+    """
+    Run a SAT command-line tool, keeping stderr for error messages.
+    
+    stdout is mostly progress text, so it goes to the null device unless
+    capture_stdout is set rather than being piped, buffered and decoded.
+    """
+    return subprocess.run(
+        cmd,
+        stdout=subprocess.PIPE if capture_stdout else subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        errors='replace',
+        timeout=timeout
+    )
+
+
+def _stat(path) -> Optional[os.stat_result]:
+    """os.stat, or None if the path does not exist."""
+    try:
+        return os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+def _sbs_references(sbs_path: str) -> List[str]:
+    """
+    Absolute paths of the external files an SBS file depends on, following
+    .sbs dependencies recursively. Library packages (``sbs://``) and
+    self-references are skipped, since they come with the SAT install.
+    """
+    found: Dict[str, None] = {}
+    pending = [os.path.abspath(sbs_path)]
+    seen = set(pending)
+    while pending:
+        path = pending.pop()
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            continue
+        base = os.path.dirname(path)
+        for match in _SBS_REF_RE.finditer(data):
+            ref = html.unescape(match.group(1).decode('utf-8', 'replace'))
+            if not ref or '://' in ref or ref.startswith('?'):
+                continue
+            ref = os.path.normpath(os.path.join(base, ref))
+            found[ref] = None
+            if ref.lower().endswith('.sbs') and ref not in seen:
+                seen.add(ref)
+                pending.append(ref)
+    return list(found)
+
+
+def _output_size_log2(resolution: int, low: int = 5, high: int = 13) -> int:
+    """
+    sbsrender's $outputsize exponent for a resolution: floor(log2),
+    clamped to [low, high], computed on the integer without floats.
+    """
+    return max(low, min(high, int(resolution).bit_length() - 1))
+
+
+def _render_jobs(job_count: int) -> int:
+    """
+    Number of sbsrender processes to run at once for job_count renders.
+    
+    Defaults to one per CPU; set SAT_RENDER_JOBS to cap it, since
+    sbsrender may already use several threads itself.
+    """
+    try:
+        limit = int(os.environ.get('SAT_RENDER_JOBS', ''))
+    except ValueError:
+        limit = os.cpu_count() or 1
+    return max(1, min(job_count, limit))
+
 
 @dataclass
 class GraphOutput:
@@ -65,6 +172,18 @@ class ThumbnailRenderer:
         self.sbsrender_path = self._find_tool('sbsrender')
         self.sbscooker_path = self._find_tool('sbscooker')
         
+        # `sbsrender info` output and detected (graph, output) by (path, mtime, size)
+        self._info_cache: Dict[Tuple[str, int, int], str] = {}
+        self._best_graph_cache: Dict[Tuple[str, int, int], Tuple[str, str]] = {}
+        self._info_lock = threading.Lock()
+        # (path, mtime_ns, size) of an .sbs -> files it references
+        self._sbs_refs_cache: Dict[Tuple[str, int, int], List[str]] = {}
+        
+        # Intermediate material ball maps, one directory per renderer
+        self._scratch_path: Optional[str] = None
+        self._scratch_ids = itertools.count()
+        self._scratch_lock = threading.Lock()
+        
         # Path to internal material ball renderer
         self.material_ball_sbsar = None
         if self.sat_path:
@@ -120,8 +239,81 @@ class ThumbnailRenderer:
         Returns:
             List of GraphInfo objects.
         """
-        if self.sbsrender_path is None:
+        info_output = self._info_output(sbsar_path)
+        if info_output is None:
             return []
+        return self._parse_graph_info(info_output)
+    
+    @staticmethod
+    def _file_key(path: str, st: Optional[os.stat_result] = None) -> Optional[Tuple[str, int, int]]:
+        """
+        Cache key for a file's current contents: (path, mtime, size).
+        Pass st when the caller has already stat'ed the file.
+        """
+        if st is None:
+            try:
+                st = os.stat(path)
+            except OSError as e:
+                logger.warning(f"Cannot stat {path}: {e}")
+                return None
+        return os.path.abspath(path), st.st_mtime_ns, st.st_size
+    
+    def _detect_graph(
+        self,
+        render_file: str,
+        st: Optional[os.stat_result] = None
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        find_best_graph for a file's graphs, cached like its `sbsrender
+        info` output. Files with no usable graph are not cached.
+        """
+        key = self._file_key(render_file, st)
+        if key is not None:
+            with self._info_lock:
+                cached = self._best_graph_cache.get(key)
+            if cached is not None:
+                return cached
+        
+        info_output = self._info_output(render_file, key)
+        graphs = self._parse_graph_info(info_output) if info_output is not None else []
+        if not graphs:
+            return None, None
+        best = self.find_best_graph(graphs)
+        
+        if key is not None and best[0] is not None:
+            with self._info_lock:
+                if len(self._best_graph_cache) >= _INFO_CACHE_SIZE:
+                    self._best_graph_cache.pop(next(iter(self._best_graph_cache)))
+                self._best_graph_cache[key] = best
+        return best
+    
+    def _info_output(
+        self,
+        sbsar_path: str,
+        key: Optional[Tuple[str, int, int]] = None
+    ) -> Optional[str]:
+        """
+        Run `sbsrender info` on a file, reusing the output while the file's
+        mtime and size are unchanged. Failures are not cached.
+        
+        Args:
+            sbsar_path: Path to the SBSAR file.
+            key: The file's ``_file_key``, if the caller already has it.
+            
+        Returns:
+            The command's stdout, or None if it failed.
+        """
+        if self.sbsrender_path is None:
+            return None
+        
+        if key is None:
+            key = self._file_key(sbsar_path)
+        if key is None:
+            return None
+        with self._info_lock:
+            cached = self._info_cache.get(key)
+        if cached is not None:
+            return cached
         
         cmd = [
             self.sbsrender_path,
@@ -130,22 +322,20 @@ class ThumbnailRenderer:
         ]
         
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
+            result = _run_tool(cmd, timeout=30, capture_stdout=True)
             
             if result.returncode != 0:
                 logger.warning(f"sbsrender info failed: {result.stderr}")
-                return []
-            
-            return self._parse_graph_info(result.stdout)
-            
+                return None
         except Exception as e:
             logger.exception(f"Error getting graph info: {e}")
-            return []
+            return None
+        
+        with self._info_lock:
+            if len(self._info_cache) >= _INFO_CACHE_SIZE:
+                self._info_cache.pop(next(iter(self._info_cache)))
+            self._info_cache[key] = result.stdout
+        return result.stdout
     
     def _parse_graph_info(self, info_output: str) -> List[GraphInfo]:
         """
@@ -154,40 +344,26 @@ class ThumbnailRenderer:
         graphs: List[GraphInfo] = []
         current_graph: Optional[GraphInfo] = None
         
-        for line in info_output.splitlines():
-            line = line.strip()
+        # One regex pass over the whole output; other lines are never split
+        for match in _INFO_LINE_RE.finditer(info_output):
+            keyword, rest = match.groups()
             
-            # Match graph URL
-            if line.startswith('GRAPH-URL'):
-                if current_graph:
-                    graphs.append(current_graph)
-                
-                url = line.replace('GRAPH-URL', '').strip()
+            if keyword == 'GRAPH-URL':
+                url = rest.strip()
                 # Extract graph name from URL like 'pkg://GraphName'
-                name = url.replace('pkg://', '') if url.startswith('pkg://') else url
-                current_graph = GraphInfo(url=url, name=name)
+                current_graph = GraphInfo(url=url, name=url.removeprefix('pkg://'))
+                graphs.append(current_graph)
                 
             elif current_graph:
-                # Match INPUT
-                if line.startswith('INPUT'):
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        current_graph.inputs.append(parts[1])
-                
-                # Match OUTPUT
-                elif line.startswith('OUTPUT'):
-                    parts = line.split()
-                    if len(parts) >= 3:
-                        output_name = parts[1]
-                        output_usage = parts[2]
-                        current_graph.outputs.append(GraphOutput(
-                            name=output_name,
-                            usage=output_usage
-                        ))
-        
-        # Don't forget the last graph
-        if current_graph:
-            graphs.append(current_graph)
+                parts = rest.split(None, 2)
+                if keyword == 'INPUT':
+                    if parts:
+                        current_graph.inputs.append(parts[0])
+                elif len(parts) >= 2:
+                    current_graph.outputs.append(GraphOutput(
+                        name=parts[0],
+                        usage=parts[1]
+                    ))
         
         return graphs
     
@@ -195,24 +371,25 @@ class ThumbnailRenderer:
         """
         Find the best graph to render for a thumbnail.
         """
-        # Priority list of output names/usages for thumbnail
-        priority_outputs = [
-            'basecolor', 'baseColor', 'diffuse', 'albedo',
-            'Base_Color', 'base_color', 'Diffuse', 'Albedo'
-        ]
+        no_match = len(_PRIORITY_OUTPUTS)
         
         for graph in graphs:
-            # Skip graphs with no outputs
-            if not graph.outputs:
-                continue
+            # Best-ranked priority output of this graph, first one on ties
+            best_output = None
+            best_rank = no_match
+            for output in graph.outputs:
+                rank = min(
+                    _PRIORITY_OUTPUTS.get(output.name.lower(), no_match),
+                    _PRIORITY_OUTPUTS.get(output.usage.lower(), no_match)
+                )
+                if rank < best_rank:
+                    best_output, best_rank = output, rank
+                    if rank == 0:
+                        break
             
-            # Look for priority outputs
-            for priority in priority_outputs:
-                for output in graph.outputs:
-                    if output.name.lower() == priority.lower() or \
-                       output.usage.lower() == priority.lower():
-                        logger.info(f"Found best graph: {graph.name} with output: {output.name}")
-                        return graph.name, output.name
+            if best_output is not None:
+                logger.info(f"Found best graph: {graph.name} with output: {best_output.name}")
+                return graph.name, best_output.name
         
         # Fallback: return first graph with any outputs
         for graph in graphs:
@@ -234,7 +411,7 @@ class ThumbnailRenderer:
             return False, '', "sbscooker not found. Check SAT installation path."
         
         sbs_file = Path(sbs_path)
-        if not sbs_file.exists():
+        if _stat(sbs_file) is None:
             return False, '', f"SBS file not found: {sbs_path}"
         
         # Determine output path
@@ -256,15 +433,10 @@ class ThumbnailRenderer:
         logger.info(f"Cooking SBS: {' '.join(cmd)}")
         
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=300
-            )
+            result = _run_tool(cmd, timeout=300)
             
             if result.returncode == 0:
-                if Path(sbsar_path).exists():
+                if _stat(sbsar_path) is not None:
                     logger.info(f"Successfully cooked to: {sbsar_path}")
                     return True, sbsar_path, None
                 else:
@@ -276,13 +448,122 @@ class ThumbnailRenderer:
         except Exception as e:
             return False, '', f"Cooking failed: {str(e)}"
 
+    def _cook_cache_key(self, sbs_path: str, st: os.stat_result) -> str:
+        """
+        Cache key for cooking an SBS file: its path, mtime and size, the same
+        for every file it references, and the sbscooker binary's identity.
+        """
+        abspath = os.path.abspath(sbs_path)
+        refs_key = (abspath, st.st_mtime_ns, st.st_size)
+        with self._info_lock:
+            refs = self._sbs_refs_cache.get(refs_key)
+        if refs is None:
+            refs = _sbs_references(abspath)
+            with self._info_lock:
+                if len(self._sbs_refs_cache) >= _INFO_CACHE_SIZE:
+                    self._sbs_refs_cache.pop(next(iter(self._sbs_refs_cache)))
+                self._sbs_refs_cache[refs_key] = refs
+        
+        parts = [f"{abspath}:{st.st_mtime_ns}:{st.st_size}"]
+        for path in [self.sbscooker_path, *refs]:
+            ref_st = _stat(path) if path else None
+            parts.append(f"{path}:{ref_st.st_mtime_ns}:{ref_st.st_size}" if ref_st else f"{path}:-")
+        return hashlib.sha1('\n'.join(parts).encode()).hexdigest()
+    
+    def _cook_cached(self, sbs_path: str) -> tuple:
+        """
+        Cook an SBS file, reusing the SBSAR cooked from the same source if
+        neither it, the files it references nor sbscooker have changed.
+        
+        Returns:
+            Tuple of (success, sbsar_path, error, temp_dir). temp_dir is the
+            directory to remove once the SBSAR has been used, or None when
+            the SBSAR lives in the cache and must be kept.
+        """
+        try:
+            st = os.stat(sbs_path)
+        except OSError:
+            return (*self.cook_sbs(sbs_path), None)
+        
+        cached = _COOK_CACHE_DIR / f"{self._cook_cache_key(sbs_path, st)}.sbsar"
+        try:
+            # Update only the access time, which the size sweep evicts by;
+            # the mtime keys the `sbsrender info` cache
+            os.utime(cached, ns=(time.time_ns(), os.stat(cached).st_mtime_ns))
+            return True, str(cached), None, None
+        except OSError:
+            pass
+        
+        try:
+            _COOK_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            work_dir = tempfile.mkdtemp(prefix='cook_', dir=_COOK_CACHE_DIR)
+        except OSError as e:
+            logger.warning(f"Cook cache unavailable: {e}")
+            success, sbsar_path, error = self.cook_sbs(sbs_path)
+            return success, sbsar_path, error, str(Path(sbsar_path).parent) if success else None
+        
+        try:
+            success, sbsar_path, error = self.cook_sbs(
+                sbs_path, os.path.join(work_dir, f"{Path(sbs_path).stem}.sbsar")
+            )
+            if not success:
+                return False, '', error, None
+            os.replace(sbsar_path, cached)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        
+        self._sweep_cook_cache()
+        return True, str(cached), None, None
+    
+    def _sweep_cook_cache(self):
+        """Delete the least recently used cooked SBSARs beyond the size limit."""
+        try:
+            with os.scandir(_COOK_CACHE_DIR) as it:
+                entries = [
+                    (entry.stat().st_atime, entry.stat().st_size, entry.path)
+                    for entry in it if entry.name.endswith('.sbsar') and entry.is_file()
+                ]
+        except OSError:
+            return
+        
+        total = sum(size for _, size, _ in entries)
+        recent = time.time() - _COOK_CACHE_MIN_AGE
+        for atime, size, path in sorted(entries):
+            if total <= _COOK_CACHE_MAX_BYTES or atime > recent:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+    
+    def invalidate_cook_cache(self):
+        """Delete every cooked SBSAR, forcing SBS files to be cooked again."""
+        shutil.rmtree(_COOK_CACHE_DIR, ignore_errors=True)
+        with self._info_lock:
+            self._info_cache.clear()
+            self._best_graph_cache.clear()
+            self._sbs_refs_cache.clear()
+
+    def _scratch_dir(self) -> str:
+        """
+        Directory for intermediate maps, created on first use and shared by
+        every render of this renderer; it is removed at exit.
+        """
+        with self._scratch_lock:
+            if self._scratch_path is None or not os.path.isdir(self._scratch_path):
+                self._scratch_path = tempfile.mkdtemp(prefix='sat_mb_maps_')
+                atexit.register(shutil.rmtree, self._scratch_path, True)
+            return self._scratch_path
+
     def _render_material_ball(
         self,
         sbsar_path: str,
         output_path: Optional[str] = None,
         resolution: int = 512,
         output_format: str = 'png',
-        graph_name: Optional[str] = None
+        graph_name: Optional[str] = None,
+        create_output_dir: bool = True
     ) -> RenderResult:
         """
         Renders a material ball using the internal material_thumbnail_render.sbsar.
@@ -296,7 +577,10 @@ class ThumbnailRenderer:
                 error="Material ball renderer not found"
             )
 
-        temp_dir = tempfile.mkdtemp(prefix='sat_mb_maps_')
+        # Maps get a per-render name prefix in the shared scratch directory
+        temp_dir = self._scratch_dir()
+        map_prefix = f"r{next(self._scratch_ids)}_"
+        rendered_maps = {}
         try:
             # 1. Get graph info to find available outputs
             graphs = self.get_graph_info(sbsar_path)
@@ -330,10 +614,9 @@ class ThumbnailRenderer:
                 'emissive': ['emissive', 'Emissive']
             }
 
-            rendered_maps = {}
             # Clamp resolution for maps and final render
             resolution = max(256, min(2048, resolution))
-            map_res_log2 = int(math.log2(resolution))
+            map_res_log2 = _output_size_log2(resolution)
             
             available_outputs = {out.name.lower(): out.name for out in target_graph.outputs}
             available_usages = {out.usage.lower(): out.name for out in target_graph.outputs}
@@ -349,18 +632,18 @@ class ThumbnailRenderer:
                         break
                 
                 if target_output:
-                    map_file_name = f"{map_type}.png"
+                    map_file_name = f"{map_prefix}{map_type}.png"
                     cmd = [
                         self.sbsrender_path, 'render',
                         '--input', sbsar_path,
                         '--input-graph', graph_name,
                         '--input-graph-output', target_output,
                         '--output-path', temp_dir,
-                        '--output-name', map_type,
+                        '--output-name', f"{map_prefix}{map_type}",
                         '--output-format', 'png',
                         '--set-value', f'$outputsize@{map_res_log2},{map_res_log2}'
                     ]
-                    subprocess.run(cmd, capture_output=True, check=False)
+                    _run_tool(cmd)
                     map_file_path = os.path.join(temp_dir, map_file_name)
                     if os.path.exists(map_file_path):
                         rendered_maps[map_type] = map_file_path
@@ -369,7 +652,7 @@ class ThumbnailRenderer:
             if output_path is None:
                 final_output_dir = tempfile.mkdtemp(prefix='sat_mb_final_')
                 output_path = os.path.join(final_output_dir, f"thumbnail.{output_format}")
-            else:
+            elif create_output_dir:
                 Path(output_path).parent.mkdir(parents=True, exist_ok=True)
 
             cmd = [
@@ -385,11 +668,11 @@ class ThumbnailRenderer:
                 cmd.extend(['--set-entry', f'{map_type}@{map_file}'])
 
             logger.info(f"Rendering material ball: {' '.join(cmd)}")
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = _run_tool(cmd)
             
             if result.returncode == 0:
                 actual_output = Path(output_path).parent / f"{Path(output_path).stem}.{output_format}"
-                if actual_output.exists():
+                if _stat(actual_output) is not None:
                     return RenderResult(
                         success=True,
                         output_path=str(actual_output),
@@ -406,7 +689,11 @@ class ThumbnailRenderer:
             )
 
         finally:
-            shutil.rmtree(temp_dir, ignore_errors=True)
+            for map_file in rendered_maps.values():
+                try:
+                    os.unlink(map_file)
+                except OSError:
+                    pass
 
     def render(
         self,
@@ -416,10 +703,15 @@ class ThumbnailRenderer:
         output_format: str = 'png',
         graph_name: Optional[str] = None,
         output_name: str = 'basecolor',
-        use_material_ball: bool = True
+        use_material_ball: bool = True,
+        create_output_dir: bool = True
     ) -> RenderResult:
         """
         Render a thumbnail from an SBS/SBSAR file.
+        
+        Pass create_output_dir=False when the caller has already created
+        the directory of output_path. Without graph_name, the best graph
+        and output are detected (and cached per file).
         """
         if self.sbsrender_path is None:
             return RenderResult(
@@ -431,7 +723,9 @@ class ThumbnailRenderer:
             )
         
         filepath = Path(filepath)
-        if not filepath.exists():
+        # One stat both checks the input and, for SBSARs, keys the caches
+        render_st = _stat(filepath)
+        if render_st is None:
             return RenderResult(
                 success=False,
                 output_path='',
@@ -441,11 +735,10 @@ class ThumbnailRenderer:
             )
         
         render_file = str(filepath)
-        temp_sbsar = None
         temp_sbsar_dir = None
         
         if filepath.suffix.lower() == '.sbs':
-            success, sbsar_path, error = self.cook_sbs(str(filepath))
+            success, sbsar_path, error, temp_sbsar_dir = self._cook_cached(str(filepath))
             if not success:
                 return RenderResult(
                     success=False,
@@ -455,8 +748,7 @@ class ThumbnailRenderer:
                     error=f"Failed to cook SBS: {error}"
                 )
             render_file = sbsar_path
-            temp_sbsar = sbsar_path
-            temp_sbsar_dir = str(Path(sbsar_path).parent)
+            render_st = None
         
         try:
             if use_material_ball and self.material_ball_sbsar:
@@ -465,24 +757,24 @@ class ThumbnailRenderer:
                     output_path, 
                     resolution, 
                     output_format, 
-                    graph_name
+                    graph_name,
+                    create_output_dir
                 )
             
             # Flat rendering fallback
             if graph_name is None:
-                graphs = self.get_graph_info(render_file)
-                if graphs:
-                    detected_graph, detected_output = self.find_best_graph(graphs)
-                    if detected_graph:
-                        graph_name = detected_graph
-                        output_name = detected_output or output_name
+                detected_graph, detected_output = self._detect_graph(render_file, render_st)
+                if detected_graph:
+                    graph_name = detected_graph
+                    output_name = detected_output or output_name
             
             if output_path is None:
                 output_dir = tempfile.mkdtemp(prefix='sat_thumb_')
                 output_path = os.path.join(output_dir, f"{filepath.stem}_preview.{output_format}")
+            elif create_output_dir:
+                Path(output_path).parent.mkdir(parents=True, exist_ok=True)
             
-            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-            log2_res = max(5, min(13, int(math.log2(resolution))))
+            log2_res = _output_size_log2(resolution)
             
             cmd = [
                 self.sbsrender_path, 'render',
@@ -496,10 +788,10 @@ class ThumbnailRenderer:
                 cmd.extend(['--input-graph', graph_name])
             cmd.extend(['--input-graph-output', output_name])
             
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = _run_tool(cmd)
             if result.returncode == 0:
                 actual_output = Path(output_path).parent / f"{Path(output_path).stem}.{output_format}"
-                if actual_output.exists():
+                if _stat(actual_output) is not None:
                     return RenderResult(
                         success=True,
                         output_path=str(actual_output),
@@ -512,10 +804,148 @@ class ThumbnailRenderer:
                 error=f"Flat render failed: {result.stderr}"
             )
         finally:
-            if temp_sbsar and Path(temp_sbsar).exists():
-                try: Path(temp_sbsar).unlink()
-                except: pass
-            if temp_sbsar_dir and Path(temp_sbsar_dir).exists():
+            if temp_sbsar_dir:
+                shutil.rmtree(temp_sbsar_dir, ignore_errors=True)
+
+    def render_to_bytes(
+        self,
+        filepath: str,
+        resolution: int = 512,
+        output_format: str = 'png',
+        graph_name: Optional[str] = None,
+        use_material_ball: bool = True
+    ) -> Tuple[RenderResult, Optional[bytes]]:
+        """
+        Render a thumbnail and return the encoded image in memory.
+        
+        sbsrender can only write image files, so the image goes to a
+        uniquely named file in the renderer's scratch directory, which is
+        read back and deleted; no output directory is created or left behind.
+        
+        Returns:
+            Tuple of (RenderResult, image bytes). The result has no
+            output_path, and the bytes are None if rendering failed.
+        """
+        output_path = os.path.join(
+            self._scratch_dir(), f"r{next(self._scratch_ids)}_thumb.{output_format}"
+        )
+        result = self.render(
+            filepath=filepath,
+            output_path=output_path,
+            resolution=resolution,
+            output_format=output_format,
+            graph_name=graph_name,
+            use_material_ball=use_material_ball,
+            create_output_dir=False
+        )
+        if not result.success:
+            return result, None
+        
+        try:
+            with open(result.output_path, 'rb') as f:
+                data = f.read()
+        finally:
+            try:
+                os.unlink(result.output_path)
+            except OSError:
+                pass
+        return replace(result, output_path=''), data
+
+    def render_outputs_batch(
+        self,
+        filepath: str,
+        output_dir: str,
+        output_names: List[str],
+        resolution: int = 512,
+        output_format: str = 'png',
+        graph_name: Optional[str] = None
+    ) -> Optional[List[RenderResult]]:
+        """
+        Render several outputs of one graph with a single sbsrender call,
+        so the file is loaded and shared nodes are evaluated only once.
+        
+        Output names are matched case-insensitively against the graph's
+        output names, then usages; names the graph lacks are skipped.
+        Images are written as ``<stem>_<output name>.<format>`` in output_dir.
+        
+        Returns:
+            RenderResults for the rendered outputs, or None if the file
+            could not be cooked or inspected or sbsrender failed, in which
+            case the outputs can still be rendered one at a time.
+        """
+        if self.sbsrender_path is None:
+            return None
+        
+        filepath = Path(filepath)
+        render_file = str(filepath)
+        temp_sbsar_dir = None
+        
+        if filepath.suffix.lower() == '.sbs':
+            success, sbsar_path, error, temp_sbsar_dir = self._cook_cached(str(filepath))
+            if not success:
+                logger.warning(f"Failed to cook SBS: {error}")
+                return None
+            render_file = sbsar_path
+        
+        try:
+            graphs = [g for g in self.get_graph_info(render_file) if g.outputs]
+            if not graphs:
+                return None
+            
+            if graph_name is None:
+                graph_name = self.find_best_graph(graphs)[0]
+            graph = next((g for g in graphs if g.name == graph_name), graphs[0])
+            
+            available_outputs = {out.name.lower(): out.name for out in graph.outputs}
+            available_usages = {out.usage.lower(): out.name for out in graph.outputs}
+            
+            # Requested name -> graph output, each graph output rendered once
+            selected: Dict[str, str] = {}
+            for name in output_names:
+                target_output = available_outputs.get(name.lower()) or available_usages.get(name.lower())
+                if target_output and target_output not in selected.values():
+                    selected[name] = target_output
+            if not selected:
+                return []
+            
+            Path(output_dir).mkdir(parents=True, exist_ok=True)
+            log2_res = _output_size_log2(resolution)
+            
+            cmd = [
+                self.sbsrender_path, 'render',
+                '--input', render_file,
+                '--input-graph', graph.name,
+                '--output-path', output_dir,
+                '--output-name', f"{filepath.stem}_{{outputNodeName}}",
+                '--output-format', output_format,
+                '--set-value', f'$outputsize@{log2_res},{log2_res}',
+            ]
+            for target_output in selected.values():
+                cmd.extend(['--input-graph-output', target_output])
+            
+            logger.info(f"Rendering outputs: {' '.join(cmd)}")
+            result = _run_tool(cmd)
+            if result.returncode != 0:
+                logger.warning(f"Batch render failed: {result.stderr}")
+                return None
+            
+            results = []
+            for name, target_output in selected.items():
+                produced = Path(output_dir) / f"{filepath.stem}_{target_output}.{output_format}"
+                if _stat(produced) is None:
+                    continue
+                actual_output = Path(output_dir) / f"{filepath.stem}_{name}.{output_format}"
+                if produced != actual_output:
+                    os.replace(produced, actual_output)
+                results.append(RenderResult(
+                    success=True,
+                    output_path=str(actual_output),
+                    graph_name=graph.name,
+                    resolution=(resolution, resolution)
+                ))
+            return results
+        finally:
+            if temp_sbsar_dir:
                 shutil.rmtree(temp_sbsar_dir, ignore_errors=True)
 
     def render_all_outputs(
@@ -527,6 +957,11 @@ class ThumbnailRenderer:
     ) -> List[RenderResult]:
         """
         Render all outputs from an SBS/SBSAR file.
+        
+        All outputs are rendered by one sbsrender call when possible (see
+        ``render_outputs_batch``). Otherwise each output is a separate
+        sbsrender process, rendered concurrently from a thread pool (see
+        ``_render_jobs``).
         """
         output_names = [
             'basecolor', 'diffuse', 'albedo',
@@ -534,21 +969,164 @@ class ThumbnailRenderer:
             'metallic', 'ambientocclusion', 'ao'
         ]
         
+        results = self.render_outputs_batch(
+            filepath, output_dir, output_names, resolution, output_format
+        )
+        if results is not None:
+            return results
+        
+        stem = Path(filepath).stem
+        # Resolve the graph once so every output render skips autodetection
+        # (and renders the output it asks for, not the detected one)
+        graph_name = None
+        render_file = filepath
+        temp_sbsar_dir = None
+        if Path(filepath).suffix.lower() == '.sbs':
+            _, render_file, _, temp_sbsar_dir = self._cook_cached(filepath)
+        if render_file:
+            graph_name = self._detect_graph(render_file)[0]
+        if temp_sbsar_dir:
+            shutil.rmtree(temp_sbsar_dir, ignore_errors=True)
+        
+        with ThreadPoolExecutor(max_workers=_render_jobs(len(output_names))) as executor:
+            futures = [
+                executor.submit(
+                    self.render,
+                    filepath=filepath,
+                    output_path=os.path.join(output_dir, f"{stem}_{output_name}.{output_format}"),
+                    resolution=resolution,
+                    output_format=output_format,
+                    output_name=output_name,
+                    graph_name=graph_name,
+                    use_material_ball=False # When rendering all maps, we don't want the ball
+                )
+                for output_name in output_names
+            ]
+        
+        # Keep output order, and keep the outputs that rendered when others fail
         results = []
-        for output_name in output_names:
-            result = self.render(
-                filepath=filepath,
-                output_path=os.path.join(output_dir, f"{Path(filepath).stem}_{output_name}.{output_format}"),
-                resolution=resolution,
-                output_format=output_format,
-                output_name=output_name,
-                use_material_ball=False # When rendering all maps, we don't want the ball
-            )
+        for output_name, future in zip(output_names, futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.warning(f"Rendering output {output_name} failed: {e}")
+                continue
             if result.success:
                 results.append(result)
         
         return results
 
+    def cook_many(
+        self,
+        filepaths: Iterable[str],
+        max_workers: int = 2
+    ) -> Iterator[Tuple[str, bool, str, Optional[str], Optional[str]]]:
+        """
+        Cook SBS files concurrently, yielding each as soon as it is ready.
+        
+        At most max_workers files are cooking or cooked but not yet taken
+        by the caller, which bounds the temporary SBSARs on disk. Files
+        that are not SBS are passed through unchanged.
+        
+        Args:
+            filepaths: Paths to SBS/SBSAR files.
+            max_workers: Number of files cooked ahead of the caller.
+            
+        Yields:
+            Tuples of (filepath, success, sbsar_path, error, temp_dir), in
+            completion order. temp_dir is the directory to remove once the
+            SBSAR has been used, or None (see ``_cook_cached``).
+        """
+        def cook(filepath):
+            if not filepath.lower().endswith('.sbs'):
+                return filepath, True, filepath, None, None
+            return (filepath, *self._cook_cached(filepath))
+        
+        def discard(future):
+            # Remove the SBSAR of a cook the caller will never take
+            if future.cancelled() or future.exception() is not None:
+                return
+            temp_dir = future.result()[4]
+            if temp_dir:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+        
+        pending_paths = iter(filepaths)
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        pending = set()
+        ready = []
+        try:
+            for filepath in itertools.islice(pending_paths, max_workers):
+                pending.add(executor.submit(cook, str(filepath)))
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                ready = list(done)
+                while ready:
+                    # Start the next cook only once this one has been taken
+                    yield ready.pop().result()
+                    filepath = next(pending_paths, None)
+                    if filepath is not None:
+                        pending.add(executor.submit(cook, str(filepath)))
+        finally:
+            # If the caller stopped early, don't wait for in-flight cooks:
+            # cancel what hasn't started and clean up the rest as they finish
+            for future in itertools.chain(ready, pending):
+                future.cancel()
+                future.add_done_callback(discard)
+            executor.shutdown(wait=False)
+    
+    def render_many(
+        self,
+        filepaths: Iterable[str],
+        output_dir: str,
+        resolution: int = 512,
+        output_format: str = 'png',
+        use_material_ball: bool = True,
+        cook_ahead: int = 2
+    ) -> Iterator[Tuple[str, RenderResult]]:
+        """
+        Render thumbnails for many files, cooking upcoming SBS files while
+        the current one renders.
+        
+        Thumbnails are written as ``<stem>_preview.<format>`` in output_dir.
+        
+        Args:
+            filepaths: Paths to SBS/SBSAR files.
+            output_dir: Output directory for thumbnails.
+            resolution: Output resolution.
+            output_format: Output format.
+            use_material_ball: Whether to render on a material ball.
+            cook_ahead: Number of files cooked ahead of rendering.
+            
+        Yields:
+            Tuples of (filepath, RenderResult), in the order files finish.
+        """
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        
+        for filepath, success, sbsar_path, error, temp_dir in self.cook_many(filepaths, cook_ahead):
+            if not success:
+                yield filepath, RenderResult(
+                    success=False,
+                    output_path='',
+                    graph_name='',
+                    resolution=(resolution, resolution),
+                    error=f"Failed to cook SBS: {error}"
+                )
+                continue
+            
+            try:
+                result = self.render(
+                    filepath=sbsar_path,
+                    output_path=os.path.join(output_dir, f"{Path(filepath).stem}_preview.{output_format}"),
+                    resolution=resolution,
+                    output_format=output_format,
+                    use_material_ball=use_material_ball,
+                    create_output_dir=False
+                )
+            finally:
+                if temp_dir:
+                    shutil.rmtree(temp_dir, ignore_errors=True)
+            yield filepath, result
+
     def get_available_outputs(self, filepath: str) -> List[str]:
         """
         Get list of available outputs from an SBS/SBSAR file.
@@ -557,20 +1135,18 @@ class ThumbnailRenderer:
             return []
         
         render_file = filepath
-        temp_sbsar = None
+        temp_sbsar_dir = None
         if filepath.lower().endswith('.sbs'):
-            success, sbsar_path, error = self.cook_sbs(filepath)
+            success, sbsar_path, error, temp_sbsar_dir = self._cook_cached(filepath)
             if not success:
                 return []
             render_file = sbsar_path
-            temp_sbsar = sbsar_path
             
-        cmd = [self.sbsrender_path, 'info', '--input', render_file]
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            if result.returncode == 0:
+            info_output = self._info_output(render_file)
+            if info_output is not None:
                 outputs = []
-                for line in result.stdout.split('\n'):
+                for line in info_output.split('\n'):
                     if 'OUTPUT' in line.upper():
                         parts = line.split()
                         if len(parts) > 1:
@@ -580,6 +1156,5 @@ class ThumbnailRenderer:
         except:
             return []
         finally:
-            if temp_sbsar and Path(temp_sbsar).exists():
-                try: Path(temp_sbsar).unlink()
-                except: pass
+            if temp_sbsar_dir:
+                shutil.rmtree(temp_sbsar_dir, ignore_errors=True)
@@ -5,6 +5,7 @@ Provides functionality to upload baked textures to the asset repository.
 """
 
 import os
+import time
 import requests
 from pathlib import Path
 from typing import Optional, List, Dict, Any, Callable
@@ -20,6 +21,8 @@ class UploadResult:
     asset_url: str = ""
     textures: List[Dict[str, str]] = field(default_factory=list)
     error: Optional[str] = None
+    # Background processing state reported by the server ('queued', ...)
+    auto_process: Optional[Dict[str, Any]] = None
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
@@ -28,7 +31,8 @@ class UploadResult:
             'assetId': self.asset_id,
             'url': self.asset_url,
             'textures': self.textures,
-            'error': self.error
+            'error': self.error,
+            'autoProcess': self.auto_process
         }
 
 
@@ -109,7 +113,8 @@ class AssetUploader:
                     data=data
                 )
             
-            if response.status_code == 200 or response.status_code == 201:
+            # 202: stored, with parameter extraction and thumbnailing queued
+            if response.status_code in (200, 201, 202):
                 result = response.json()
                 return UploadResult(
                     success=True,
@@ -119,7 +124,8 @@ class AssetUploader:
                         'channel': filepath.stem.split('_')[-1] if '_' in filepath.stem else 'unknown',
                         'filename': filepath.name,
                         'url': result.get('url', '')
-                    }]
+                    }],
+                    auto_process=result.get('autoProcess')
                 )
             else:
                 return UploadResult(
@@ -271,6 +277,50 @@ class AssetUploader:
             tags=tags
         )
     
+    def get_process_status(self, asset_id: str) -> Dict[str, Any]:
+        """
+        Get the background processing status of an uploaded asset.
+        
+        Args:
+            asset_id: ID returned by ``upload_file``.
+            
+        Returns:
+            Status dictionary; 'status' is one of 'queued', 'running',
+            'done', 'failed' or 'idle' (nothing pending).
+        """
+        response = self._session.get(
+            f"{self.api_base_url}/assets/{asset_id}/process-status",
+            timeout=10
+        )
+        response.raise_for_status()
+        return response.json()
+    
+    def wait_for_processing(
+        self,
+        asset_id: str,
+        timeout: float = 600,
+        poll_interval: float = 1.0
+    ) -> Dict[str, Any]:
+        """
+        Poll until an asset's background processing has finished.
+        
+        Args:
+            asset_id: ID returned by ``upload_file``.
+            timeout: Maximum seconds to wait.
+            poll_interval: Seconds between polls.
+            
+        Returns:
+            The final status dictionary, or the last one seen on timeout.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            status = self.get_process_status(asset_id)
+            if status.get('status') not in ('queued', 'running'):
+                return status
+            if time.monotonic() >= deadline:
+                return status
+            time.sleep(poll_interval)
+    
     def check_connection(self) -> bool:
         """
         Check if the API is reachable.